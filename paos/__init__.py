@@ -55,7 +55,7 @@ from paos.core.coordinateBreak import coordinate_break
 from paos.core.raytrace import raytrace
 from paos.core.plot import plot_pop
 from paos.core.saveOutput import save_output, save_datacube
-from paos.core.run import run
+from paos.core.run import run, run_wfe
 
 # initialise plotter
 import matplotlib.pyplot as plt
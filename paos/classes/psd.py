@@ -1,5 +1,4 @@
 import numpy as np
-import sympy
 import astropy.units as u
 
 from paos import logger
@@ -152,6 +151,9 @@ class PSD:
         Method to compute the rms of the surface error field (SFE) from the power spectral density (PSD).
         It uses sympy to evaluate the integral of the PSD.
         """
+        # sympy is slow to import and only needed here: import it on first use
+        import sympy
+
         # define symbols
         f = sympy.symbols("f")
         a, b, c, fknee, fmin, fmax = sympy.symbols("a b c fknee fmin fmax")
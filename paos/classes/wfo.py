@@ -1,3 +1,6 @@
+from collections import OrderedDict
+from functools import lru_cache
+
 import numpy as np
 import photutils
 import astropy.units as u
@@ -7,6 +10,133 @@ from paos.classes.zernike import Zernike
 from paos.classes.psd import PSD
 
 
+@lru_cache(maxsize=4)
+def polar_grid(shape, dx, dy, radius, offset=0.0, origin="x"):
+    """
+    Given the wavefront array shape and sampling, returns the polar coordinates of the grid pixels.
+    The result is cached, so that repeated runs on the same grid (e.g. Monte Carlo realizations of
+    a wavefront error, possibly within the same parallel worker) do not rebuild the coordinates.
+
+    Parameters
+    ----------
+    shape: tuple
+        the wavefront array shape
+    dx: scalar
+        pixel sampling interval along x-axis
+    dy: scalar
+        pixel sampling interval along y-axis
+    radius: float
+        the radius used to normalise the radial coordinate
+    offset: float
+        Angular offset in degrees.
+    origin: string
+        Angles measured counter-clockwise positive from x axis by default (origin='x').
+        Set origin='y' for angles measured clockwise-positive from the y-axis.
+
+    Returns
+    -------
+    out: tuple(array, array)
+        the normalised radial coordinate and the azimuthal coordinate, as read-only arrays
+    """
+    x = (np.arange(shape[1]) - shape[1] // 2) * dx
+    y = (np.arange(shape[0]) - shape[0] // 2) * dy
+
+    xx, yy = np.meshgrid(x, y)
+    rho = np.sqrt(xx**2 + yy**2) / radius
+
+    if origin == "x":
+        phi = np.arctan2(yy, xx) + np.deg2rad(offset)
+    elif origin == "y":
+        phi = np.arctan2(xx, yy) + np.deg2rad(offset)
+    else:
+        logger.error(
+            "Origin {} not recognised. Origin shall be either x or y".format(
+                origin
+            )
+        )
+        raise ValueError(
+            "Origin {} not recognised. Origin shall be either x or y".format(
+                origin
+            )
+        )
+
+    # The cached arrays are shared between calls
+    rho.setflags(write=False)
+    phi.setflags(write=False)
+
+    return rho, phi
+
+
+# Upper bound, in bytes, of the memory held by the cached Zernike polynomials (per process)
+ZERNIKE_CACHE_MAXBYTES = 128 * 1024**2
+
+_zernike_cache = OrderedDict()
+_zernike_cache_nbytes = 0
+
+
+def zernike_polynomials(
+    active, shape, dx, dy, radius, offset, origin, ordering, normalize
+):
+    """
+    Returns the Zernike polynomials of the given (active) indices, sampled on the wavefront grid.
+    The result is cached, so that the Monte Carlo realizations of a wavefront error, which share the
+    same Zernike surface and only differ in the coefficients, evaluate the polynomials once per worker.
+    Only the active polynomials are kept, in a least recently used cache bounded to
+    ZERNIKE_CACHE_MAXBYTES: larger stacks of polynomials are evaluated at each call and never cached.
+
+    Parameters
+    ----------
+    active: tuple of int
+        increasing indices of the polynomials to return
+    shape: tuple
+        the wavefront array shape
+    dx: scalar
+        pixel sampling interval along x-axis
+    dy: scalar
+        pixel sampling interval along y-axis
+    radius: float
+        The radius of the circular aperture over which the polynomials are calculated.
+    offset: float
+        Angular offset in degrees.
+    origin: string
+        Angles measured counter-clockwise positive from x axis (origin='x') or
+        clockwise-positive from the y-axis (origin='y').
+    ordering: string
+        Can be 'ansi', 'noll', 'fringe', or 'standard'.
+    normalize: bool
+        Polynomials are normalised to RMS=1 if True, or to unity at radius if False.
+
+    Returns
+    -------
+    out: array [len(active), shape[0], shape[1]]
+        the Zernike polynomials, as a read-only array
+    """
+    global _zernike_cache_nbytes
+
+    key = (active, shape, dx, dy, radius, offset, origin, ordering, normalize)
+    if key in _zernike_cache:
+        _zernike_cache.move_to_end(key)
+        return _zernike_cache[key]
+
+    rho, phi = polar_grid(shape, dx, dy, radius, offset, origin)
+    zernike = Zernike(
+        active[-1] + 1, rho, phi, ordering=ordering, normalize=normalize
+    )
+    polynomials = zernike().data[list(active)]
+
+    # The cached array is shared between calls
+    polynomials.setflags(write=False)
+
+    if polynomials.nbytes <= ZERNIKE_CACHE_MAXBYTES:
+        _zernike_cache[key] = polynomials
+        _zernike_cache_nbytes += polynomials.nbytes
+        # Evict the least recently used entries until the cache fits the bound
+        while _zernike_cache_nbytes > ZERNIKE_CACHE_MAXBYTES:
+            _zernike_cache_nbytes -= _zernike_cache.popitem(last=False)[1].nbytes
+
+    return polynomials
+
+
 class WFO:
     """
     Physical optics wavefront propagation.
@@ -26,6 +156,9 @@ class WFO:
         grid size must be a power of 2
     zoom: scalar
         linear scaling factor of input beam.
+    dtype: numpy dtype
+        complex dtype of the wavefront array. Defaults to np.complex128; np.complex64 halves
+        the memory footprint and speeds up the FFTs at the cost of single-precision accuracy.
 
     Attributes
     ----------
@@ -53,7 +186,7 @@ class WFO:
         curvature of the reference surface at beam position
     fratio: scalar
         pilot Gaussian beam f-ratio
-    wfo: array [gridsize, gridsize], complex128
+    wfo: array [gridsize, gridsize], complex128 (or complex64)
         the wavefront complex array
     amplitude: array [gridsize, gridsize], float64
         the wavefront amplitude array
@@ -92,12 +225,15 @@ class WFO:
 
     """
 
-    def __init__(self, beam_diameter, wl, grid_size, zoom):
+    def __init__(
+        self, beam_diameter, wl, grid_size, zoom, dtype=np.complex128
+    ):
 
         assert np.log2(grid_size).is_integer(), "Grid size should be 2**n"
         assert zoom > 0, "zoom factor should be positive"
         assert beam_diameter > 0, "beam diameter should be positive"
         assert wl > 0, "a wavelength should be positive"
+        assert np.issubdtype(dtype, np.complexfloating), "dtype should be complex"
 
         self._wl = wl
         self._z = 0.0  # current beam z coordinate
@@ -112,7 +248,7 @@ class WFO:
         self._fratio = np.inf  # Gaussian beam f-ratio
 
         grid_size = np.uint(grid_size)
-        self._wfo = np.ones((grid_size, grid_size), dtype=np.complex128)
+        self._wfo = np.ones((grid_size, grid_size), dtype=dtype)
 
     @property
     def wl(self):
@@ -183,6 +319,25 @@ class WFO:
             (self._wfo.shape[0] // 2 - 1) * self.dy,
         )
 
+    def _phasor(self, phase):
+        """
+        Returns exp(1j * phase) in the wavefront dtype, for single precision wavefronts.
+        The phase is wrapped to [0, 2pi) in double precision before being rounded, so that
+        large phases keep their single precision accuracy
+
+        Parameters
+        ----------
+        phase: array
+            the phase, in radians
+
+        Returns
+        -------
+        out: array
+            the phase factor, with the same complex dtype as the wavefront
+        """
+        phase = np.mod(phase, 2.0 * np.pi).astype(self._wfo.real.dtype)
+        return np.exp(self._wfo.dtype.type(1.0j) * phase)
+
     def make_stop(self):
         """
         Make current surface a stop.
@@ -362,7 +517,14 @@ class WFO:
         qphase = -(xx**2 + yy**2) * (0.5 * lens_phase / self.wl)
 
         self._fratio = np.abs(delta_z) / (2 * wz)
-        self._wfo = self._wfo * np.exp(2.0j * np.pi * qphase)
+        # Single precision wavefronts get single precision phase factors, so that the product
+        # (and the following FFTs) do not promote them back to double precision. The double
+        # precision expression is left as it is: numpy reuses the phase factor temporary for
+        # the product, and any other form of it rounds differently
+        if self._wfo.dtype == np.complex128:
+            self._wfo = self._wfo * np.exp(2.0j * np.pi * qphase)
+        else:
+            self._wfo = self._wfo * self._phasor(2.0 * np.pi * qphase)
 
     def Magnification(self, My, Mx=None):
         """
@@ -468,11 +630,15 @@ class WFO:
         fy = np.fft.fftfreq(wf.shape[0], d=self.dy)
         fxx, fyy = np.meshgrid(fx, fy)
         qphase = (np.pi * self.wl * dz) * (fxx**2 + fyy**2)
-        wf = np.fft.ifft2(np.exp(-1.0j * qphase) * wf, norm="ortho")
+        # Phase factor in the wavefront dtype (see lens)
+        if self._wfo.dtype == np.complex128:
+            wf = np.fft.ifft2(np.exp(-1.0j * qphase) * wf, norm="ortho")
+        else:
+            wf = np.fft.ifft2(self._phasor(-qphase) * wf, norm="ortho")
 
         self._z = self._z + dz
 
-        self._wfo = np.fft.fftshift(wf)
+        self._wfo = np.fft.fftshift(wf).astype(self._wfo.dtype, copy=False)
 
     def stw(self, dz):
         """
@@ -511,7 +677,12 @@ class WFO:
         self._C = 0.0
         self._dx = (fx[1] - fx[0]) * self.wl * np.abs(dz)
         self._dy = (fy[1] - fy[0]) * self.wl * np.abs(dz)
-        self._wfo = np.fft.fftshift(np.exp(1.0j * qphase) * wf)
+        # Phase factor in the wavefront dtype (see lens)
+        if self._wfo.dtype == np.complex128:
+            wf = np.exp(1.0j * qphase) * wf
+        else:
+            wf = self._phasor(qphase) * wf
+        self._wfo = np.fft.fftshift(wf).astype(self._wfo.dtype, copy=False)
 
     def wts(self, dz):
         """
@@ -539,7 +710,11 @@ class WFO:
 
         xx, yy = np.meshgrid(x, y)
         qphase = (np.pi / (dz * self.wl)) * (xx**2 + yy**2)
-        wf = np.fft.ifftshift(np.exp(1.0j * qphase) * self._wfo)
+        # Phase factor in the wavefront dtype (see lens)
+        if self._wfo.dtype == np.complex128:
+            wf = np.fft.ifftshift(np.exp(1.0j * qphase) * self._wfo)
+        else:
+            wf = np.fft.ifftshift(self._phasor(qphase) * self._wfo)
         if s == "forward":
             wf = np.fft.fft2(wf, norm="ortho")
         elif s == "reverse":
@@ -549,7 +724,7 @@ class WFO:
         self._C = 1 / (self.z - self.zw0)
         self._dx = self.wl * np.abs(dz) / (wf.shape[1] * self.dx)
         self._dy = self.wl * np.abs(dz) / (wf.shape[1] * self.dy)
-        self._wfo = np.fft.fftshift(wf)
+        self._wfo = np.fft.fftshift(wf).astype(self._wfo.dtype, copy=False)
 
     def propagate(self, dz):
         """
@@ -609,35 +784,42 @@ class WFO:
             np.diff(index) - 1
         ), "Zernike sequence should be continuous"
 
-        x = (np.arange(self._wfo.shape[1]) - self._wfo.shape[1] // 2) * self.dx
-        y = (np.arange(self._wfo.shape[0]) - self._wfo.shape[0] // 2) * self.dy
-
-        xx, yy = np.meshgrid(x, y)
-        rho = np.sqrt(xx**2 + yy**2) / radius
-
-        if origin == "x":
-            phi = np.arctan2(yy, xx) + np.deg2rad(offset)
-        elif origin == "y":
-            phi = np.arctan2(xx, yy) + np.deg2rad(offset)
-        else:
-            logger.error(
-                "Origin {} not recognised. Origin shall be either x or y".format(
-                    origin
-                )
-            )
-            raise ValueError(
-                "Origin {} not recognised. Origin shall be either x or y".format(
-                    origin
-                )
-            )
-        zernike = Zernike(
-            len(index), rho, phi, ordering=ordering, normalize=normalize
+        rho, phi = polar_grid(
+            self._wfo.shape, self.dx, self.dy, radius, offset, origin
         )
-        zer = zernike()
-        wfe = (zer.T * Z).T.sum(axis=0)
-        self._wfo = self._wfo * np.exp(
-            2.0 * np.pi * 1j * wfe / self._wl
-        ).filled(0)
+        # Only evaluate the polynomials up to the last nonzero coefficient, and
+        # only keep and contract over the nonzero ones
+        Z = np.asarray(Z, dtype=np.float64)
+        active = np.flatnonzero(Z)
+        if not active.size:
+            active = np.zeros(1, dtype=int)
+        zer = zernike_polynomials(
+            tuple(active.tolist()),
+            self._wfo.shape,
+            self.dx,
+            self.dy,
+            radius,
+            offset,
+            origin,
+            ordering,
+            normalize,
+        )
+        # Contract over the polynomial axis in a single BLAS call, instead of
+        # allocating the (N, grid, grid) product of coefficients and polynomials
+        wfe = np.ma.MaskedArray(
+            np.tensordot(Z[active], zer, axes=1),
+            mask=rho > 1.0,
+            fill_value=0.0,
+        )
+        # Phase factor in the wavefront dtype (see lens)
+        if self._wfo.dtype == np.complex128:
+            self._wfo = self._wfo * np.exp(
+                2.0 * np.pi * 1j * wfe / self._wl
+            ).filled(0)
+        else:
+            self._wfo = self._wfo * self._phasor(
+                2.0 * np.pi * wfe / self._wl
+            ).filled(0)
 
         return wfe
 
@@ -689,14 +871,14 @@ class WFO:
         f[f == 0] = 1e-100
 
         if fmax is None:
-            print("WARNING: fmax not provided, using f_Nyq")
+            logger.warning("fmax not provided, using f_Nyq")
             fmax = 0.5 * np.sqrt(self.dx**-2 + self.dy**-2)
         else:
             f_Nyq = 0.5 * np.sqrt(self.dx**-2 + self.dy**-2)
             assert fmax <= f_Nyq, f"fmax must be less than or equal to f_Nyq ({f_Nyq})"
 
         if fmin is None:
-            print("WARNING: fmin not provided, using 1 / D")
+            logger.warning("fmin not provided, using 1 / D")
             fmin = 1 / (self._wfo.shape[0] * np.max([self.dx, self.dy]))
 
         # compute 2D PSD
@@ -715,7 +897,11 @@ class WFO:
         wfe = psd()
 
         # update wfo
-        self._wfo = self._wfo * np.exp(2.0 * np.pi * 1j * wfe / self._wl)
+        # Phase factor in the wavefront dtype (see lens)
+        if self._wfo.dtype == np.complex128:
+            self._wfo = self._wfo * np.exp(2.0 * np.pi * 1j * wfe / self._wl)
+        else:
+            self._wfo = self._wfo * self._phasor(2.0 * np.pi * wfe / self._wl)
 
         return wfe
 
@@ -1,9 +1,62 @@
+from functools import lru_cache
 from math import factorial as fac
 
 import numpy as np
 from scipy.special import eval_jacobi as jacobi
 
 
+@lru_cache(maxsize=None)
+def j2mn_table(N, ordering):
+    """
+    Convert index j into azimuthal number, m, and radial number, n
+    for the first N Zernikes. The result is cached: use :meth:`Zernike.j2mn`.
+
+    Parameters
+    ----------
+    N: integer
+        Number of polynomials (starting from Piston)
+    ordering: string
+        can take values 'ansi', 'standard', 'noll', 'fringe'
+
+    Returns
+    -------
+    m, n: array
+        read-only arrays
+    """
+    j = np.arange(N, dtype=int)
+
+    if ordering == "ansi":
+        n = np.ceil((-3.0 + np.sqrt(9.0 + 8.0 * j)) / 2.0).astype(int)
+        m = 2 * j - n * (n + 2)
+    elif ordering == "standard":
+        n = np.ceil((-3.0 + np.sqrt(9.0 + 8.0 * j)) / 2.0).astype(int)
+        m = -2 * j + n * (n + 2)
+    elif ordering == "noll":
+        index = j + 1
+        n = ((0.5 * (np.sqrt(8 * index - 7) - 3)) + 1).astype(int)
+        cn = n * (n + 1) / 2 + 1
+        m = np.empty(N, dtype=int)
+        idx = n % 2 == 0
+        m[idx] = (index[idx] - cn[idx] + 1) // 2 * 2
+        m[~idx] = (index[~idx] - cn[~idx]) // 2 * 2 + 1
+        m = (-1) ** (index % 2) * m
+    elif ordering == "fringe":
+        index = j + 1
+        m_n = 2 * (np.ceil(np.sqrt(index)) - 1)
+        g_s = (m_n / 2) ** 2 + 1
+        n = m_n / 2 + np.floor((index - g_s) / 2)
+        m = (m_n - n) * (1 - np.mod(index - g_s, 2) * 2)
+        m, n = m.astype(int), n.astype(int)
+    else:
+        raise NameError("Ordering not supported.")
+
+    # The cached arrays are shared between calls
+    m.setflags(write=False)
+    n.setflags(write=False)
+
+    return m, n
+
+
 class Zernike:
     """
     Generates Zernike polynomials
@@ -101,7 +154,7 @@ class Zernike:
         self.Zrad = [Z[n][m].view() for m, n in zip(self.m, self.n)]
 
         Z = {0: np.ones_like(phi)}
-        for m in range(1, self.m.max() + 1):
+        for m in range(1, np.abs(self.m).max() + 1):
             Z[m] = np.cos(m * phi)
             Z[-m] = np.sin(m * phi)
         self.Zphi = [Z[m].view() for m in self.m]
@@ -152,34 +205,13 @@ class Zernike:
         m, n: array
 
         """
-        j = np.arange(N, dtype=int)
-
-        if ordering == "ansi":
-            n = np.ceil((-3.0 + np.sqrt(9.0 + 8.0 * j)) / 2.0).astype(int)
-            m = 2 * j - n * (n + 2)
-        elif ordering == "standard":
-            n = np.ceil((-3.0 + np.sqrt(9.0 + 8.0 * j)) / 2.0).astype(int)
-            m = -2 * j + n * (n + 2)
-        elif ordering == "noll":
-            index = j + 1
-            n = ((0.5 * (np.sqrt(8 * index - 7) - 3)) + 1).astype(int)
-            cn = n * (n + 1) / 2 + 1
-            m = np.empty(N, dtype=int)
-            idx = n % 2 == 0
-            m[idx] = (index[idx] - cn[idx] + 1) // 2 * 2
-            m[~idx] = (index[~idx] - cn[~idx]) // 2 * 2 + 1
-            m = (-1) ** (index % 2) * m
-        elif ordering == "fringe":
-            index = j + 1
-            m_n = 2 * (np.ceil(np.sqrt(index)) - 1)
-            g_s = (m_n / 2) ** 2 + 1
-            n = m_n / 2 + np.floor((index - g_s) / 2)
-            m = (m_n - n) * (1 - np.mod(index - g_s, 2) * 2)
-            return m.astype(int), n.astype(int)
-        else:
-            raise NameError("Ordering not supported.")
+        # The (m, n) of the first N Zernikes are a prefix of those of any larger N: slice them
+        # from a cached table sized to the next power of two, so that growing N (e.g. adding
+        # rows in the Zernike editor) does not recompute them each time
+        size = 1 << max(int(N) - 1, 0).bit_length()
+        m, n = j2mn_table(size, ordering)
 
-        return m, n
+        return m[:N], n[:N]
 
     @staticmethod
     def mn2j(m, n, ordering):
@@ -7,6 +7,7 @@ from pathlib import Path
 import numpy as np
 from astropy.io import ascii
 from joblib import delayed
+from joblib import effective_n_jobs
 from joblib import Parallel
 from tqdm import tqdm
 
@@ -141,7 +142,13 @@ def pipeline(passvalue):
         logger.info("Start POP using a single thread...")
 
     start_time = time.time()
-    retval = Parallel(n_jobs=passvalue["n_jobs"])(
+    retval = Parallel(
+        # Do not start more worker processes than runs
+        n_jobs=min(effective_n_jobs(passvalue["n_jobs"]), len(optc)) or 1,
+        backend="loky",
+        mmap_mode="r",
+        return_as="generator",
+    )(
         delayed(run)(
             pup_diameter,
             1.0e-6 * wavelengths[key],
@@ -152,9 +159,15 @@ def pipeline(passvalue):
         )
         for key, opt_chain in tqdm(optc.items())
     )
-    end_time = time.time()
-    logger.info("POP completed in {:6.1f}s".format(end_time - start_time))
-    _ = gc.collect()
+    if passvalue["plot"] or passvalue["return"]:
+        # The outputs are needed after saving: keep them in memory
+        retval = list(retval)
+        end_time = time.time()
+        logger.info("POP completed in {:6.1f}s".format(end_time - start_time))
+        _ = gc.collect()
+    else:
+        # Stream each output to file as soon as it is ready
+        logger.debug("POP outputs are saved as they complete")
 
     logger.debug(
         "---------------------------------------------------------------------"
@@ -173,6 +186,12 @@ def pipeline(passvalue):
         keys_to_keep=store_keys,
         overwrite=True,
     )
+    if not isinstance(retval, list):
+        end_time = time.time()
+        logger.info(
+            "POP completed and saved in {:6.1f}s".format(end_time - start_time)
+        )
+        _ = gc.collect()
 
     if passvalue["plot"]:
 
@@ -555,7 +555,9 @@ def plot_psf_xsec(
     return
 
 
-def plot_surface(key, retval, ima_scale, origin="lower", zoom=1, figname=None):
+def plot_surface(
+    key, retval, ima_scale, origin="lower", zoom=1, figname=None, fig=None
+):
     """
     Given the optical surface key, the POP output dictionary and the image scale, plots the squared amplitude
     of the wavefront at the given surface (cross-sections and 2D plot)
@@ -574,6 +576,9 @@ def plot_surface(key, retval, ima_scale, origin="lower", zoom=1, figname=None):
         the surface zoom factor: more increases the axis limits
     figname: str
         name of figure to save
+    fig: :class:`~matplotlib.figure.Figure`
+        if given, the empty figure to plot on, e.g. a figure not managed by pyplot (which is cheaper to create,
+        as it needs no GUI backend window). Defaults to a new pyplot figure
 
     Returns
     -------
@@ -582,7 +587,10 @@ def plot_surface(key, retval, ima_scale, origin="lower", zoom=1, figname=None):
 
     """
 
-    fig, axs = plt.subplots(nrows=1, ncols=2, figsize=(12, 6))
+    if fig is None:
+        fig, axs = plt.subplots(nrows=1, ncols=2, figsize=(12, 6))
+    else:
+        axs = fig.subplots(nrows=1, ncols=2)
     # Xsec plot
     plot_psf_xsec(
         fig=fig,
@@ -609,6 +617,6 @@ def plot_surface(key, retval, ima_scale, origin="lower", zoom=1, figname=None):
 
     if figname is not None:
         fig.savefig(figname, bbox_inches="tight", dpi=150)
-        plt.close()
+        plt.close(fig)
 
     return fig
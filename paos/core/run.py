@@ -26,7 +26,15 @@ def push_results(wfo):
     return retval
 
 
-def run(pupil_diameter, wavelength, gridsize, zoom, field, opt_chain):
+def run(
+    pupil_diameter,
+    wavelength,
+    gridsize,
+    zoom,
+    field,
+    opt_chain,
+    dtype=np.complex128,
+):
     """
     Run the POP.
 
@@ -44,6 +52,9 @@ def run(pupil_diameter, wavelength, gridsize, zoom, field, opt_chain):
         contains the slopes in the tangential and sagittal planes as field={'vt': slopey, 'vs': slopex}
     opt_chain: list
         the list of the optical elements parsed by paos.core.parseConfig.parse_config
+    dtype: numpy dtype
+        complex dtype of the propagated wavefront. Defaults to np.complex128.
+        Use np.complex64 for a faster, single-precision propagation.
 
     Returns
     -------
@@ -71,7 +82,7 @@ def run(pupil_diameter, wavelength, gridsize, zoom, field, opt_chain):
     ABCDt = ABCD()
     ABCDs = ABCD()
 
-    wfo = WFO(pupil_diameter, wavelength, gridsize, zoom)
+    wfo = WFO(pupil_diameter, wavelength, gridsize, zoom, dtype=dtype)
 
     for index, item in opt_chain.items():
 
@@ -226,3 +237,64 @@ def run(pupil_diameter, wavelength, gridsize, zoom, field, opt_chain):
     _ = gc.collect()
 
     return retval
+
+
+def run_wfe(
+    pupil_diameter,
+    wavelength,
+    gridsize,
+    zoom,
+    field,
+    opt_chain,
+    surface,
+    Z,
+    dtype=np.complex128,
+):
+    """
+    Run the POP for a single wavefront error realization, i.e. after replacing the Zernike coefficients
+    of the given Zernike surface in the optical chain.
+
+    Parameters
+    ----------
+    pupil_diameter: scalar
+        input pupil diameter in meters
+    wavelength: scalar
+        wavelength in meters
+    gridsize: scalar
+        the size of the simulation grid. It has to be a power of 2
+    zoom: scalar
+        zoom factor
+    field: dictionary
+        contains the slopes in the tangential and sagittal planes as field={'vt': slopey, 'vs': slopex}
+    opt_chain: list
+        the list of the optical elements parsed by paos.core.parseConfig.parse_config. It is not modified.
+    surface: int
+        the index of the Zernike surface in opt_chain
+    Z: array
+        the Zernike coefficients of the wavefront error realization, in meters
+    dtype: numpy dtype
+        complex dtype of the propagated wavefront. Defaults to np.complex128
+
+    Returns
+    -------
+    out: dict
+        dictionary containing the results of the POP
+
+    Examples
+    --------
+
+    >>> from joblib import Parallel, delayed
+    >>> from paos.core.parseConfig import parse_config
+    >>> from paos.core.run import run_wfe
+    >>> pup_diameter, parameters, wavelengths, fields, opt_chains = parse_config('path/to/conf/file')
+    >>> ret_val_list = Parallel(n_jobs=2)(delayed(run_wfe)(pup_diameter, 1.0e-6 * wavelengths[0],
+    >>>               parameters['grid_size'], parameters['zoom'], fields[0], opt_chains[0], 4, Z) for Z in Z_list)
+
+    """
+
+    # Shallow copy: only the Zernike surface entry is replaced
+    opt_chain = {**opt_chain, surface: {**opt_chain[surface], "Z": Z}}
+
+    return run(
+        pupil_diameter, wavelength, gridsize, zoom, field, opt_chain, dtype
+    )
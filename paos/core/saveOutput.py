@@ -1,6 +1,8 @@
 import datetime
 import os
-from copy import deepcopy as dc
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from types import GeneratorType
 
 import h5py
 import numpy as np
@@ -41,7 +43,36 @@ def remove_keys(dictionary, keys):
     return
 
 
-def save_recursively_to_hdf5(dictionary, outgroup):
+def write_deflated_chunk(dataset, data):
+    """
+    Given a single-chunk hdf5 dataset created with the 'shuffle' and 'gzip' filters and a numpy array,
+    shuffles the array bytes (grouping the n-th bytes of all elements, as the hdf5 'shuffle' filter does),
+    compresses them with zlib (the algorithm behind the hdf5 'gzip' filter) and writes them directly as
+    the dataset chunk, bypassing the hdf5 filter pipeline.
+
+    Parameters
+    ----------
+    dataset: `~h5py.Dataset`
+        the hdf5 dataset, with chunks equal to its shape, 'shuffle' and 'gzip' compression
+    data: array
+        the array to store
+
+    Returns
+    -------
+    None
+        Writes the compressed array to the dataset
+
+    """
+    # The similar high-order bytes of neighbouring floats end up next to each other, so they deflate better
+    shuffled = np.ascontiguousarray(data).view(np.uint8).reshape(-1, data.itemsize).T
+    dataset.id.write_direct_chunk(
+        (0,) * data.ndim, zlib.compress(np.ascontiguousarray(shuffled), 4)
+    )
+
+
+def save_recursively_to_hdf5(
+    dictionary, outgroup, compression=None, deferred=None
+):
     """
     Given a dictionary and a hdf5 object, saves the dictionary to the hdf5 object.
 
@@ -51,6 +82,13 @@ def save_recursively_to_hdf5(dictionary, outgroup):
         a dictionary instance to be stored in a hdf5 file
     outgroup
         a hdf5 file object in which to store the dictionary instance
+    compression: str
+        if given, the hdf5 compression filter (e.g. 'gzip') for the 2D arrays, which
+        are stored as a single byte-shuffled chunk each. If None (default), arrays are stored uncompressed
+    deferred: list
+        if given and compression is 'gzip', the 2D datasets are only created, and the
+        (dataset, array) pairs are appended to this list to be written later using
+        :func:`write_deflated_chunk`
 
     Returns
     -------
@@ -62,9 +100,30 @@ def save_recursively_to_hdf5(dictionary, outgroup):
     for key, data in dictionary.items():
         if isinstance(data, dict):
             sub_outgroup = outgroup.create_group(key)
-            save_recursively_to_hdf5(data, sub_outgroup)
+            save_recursively_to_hdf5(
+                data, sub_outgroup, compression, deferred
+            )
         elif isinstance(data, (str, int, float, tuple)):
             outgroup.create_dataset(key, data=data)
+        elif isinstance(data, np.ndarray) and compression and data.ndim > 1:
+            if compression == "gzip" and deferred is not None:
+                dataset = outgroup.create_dataset(
+                    key,
+                    shape=data.shape,
+                    dtype=data.dtype,
+                    chunks=data.shape,
+                    compression=compression,
+                    shuffle=True,
+                )
+                deferred.append((dataset, data))
+                continue
+            outgroup.create_dataset(
+                key,
+                data=data,
+                chunks=data.shape,
+                compression=compression,
+                shuffle=True,
+            )
         elif isinstance(data, np.ndarray):
             outgroup.create_dataset(
                 key, data=data, shape=data.shape, dtype=data.dtype
@@ -82,6 +141,34 @@ def save_recursively_to_hdf5(dictionary, outgroup):
             raise NameError("data type not supported")
 
 
+def write_deferred(deferred):
+    """
+    Given the list of (dataset, array) pairs collected by :func:`save_recursively_to_hdf5`,
+    compresses the arrays in a pool of threads (zlib releases the GIL, so the compression
+    runs in parallel) and writes each of them as a raw dataset chunk.
+
+    Parameters
+    ----------
+    deferred: list or None
+        list of (dataset, array) pairs. If None or empty, nothing is done
+
+    Returns
+    -------
+    None
+        Writes the compressed arrays to their datasets
+
+    """
+    if not deferred:
+        return
+
+    logger.trace("compressing {} arrays".format(len(deferred)))
+    with ThreadPoolExecutor() as executor:
+        # Consume the iterator to re-raise any exception from the threads
+        list(executor.map(write_deflated_chunk, *zip(*deferred)))
+
+    return
+
+
 def save_info(file_name, out):
     """
     Inspired by a similar function from ExoRad2.
@@ -120,7 +207,7 @@ def save_info(file_name, out):
     return
 
 
-def save_retval(retval, keys_to_keep, out):
+def save_retval(retval, keys_to_keep, out, compression=None, deferred=None):
     """
     Given the POP simulation output dictionary, the keys to store at each surface and the
     hdf5 file object, it saves the output dictionary to a hdf5 file.
@@ -133,6 +220,10 @@ def save_retval(retval, keys_to_keep, out):
         dictionary keys to store at each surface. example: ['amplitude', 'dx', 'dy']
     out: `~h5py.File`
         instance of hdf5 file object
+    compression: str
+        hdf5 compression filter for the 2D arrays. If None (default), arrays are stored uncompressed
+    deferred: list
+        if given, collects the 2D arrays to be written later (see :func:`save_recursively_to_hdf5`)
 
     Returns
     -------
@@ -146,27 +237,29 @@ def save_retval(retval, keys_to_keep, out):
         group_name = "S{:02d}".format(index)
         logger.trace("saving {}".format(group_name))
 
-        item = dc(retval[index])
+        # Select the keys to store, without copying the (large) arrays
+        item = {
+            key: data
+            for key, data in retval[index].items()
+            if keys_to_keep is None or key in keys_to_keep
+        }
 
-        if item["aperture"] is not None:
+        if item.get("aperture") is not None:
             item["aperture"] = item["aperture"].__dict__
 
-        item["ABCDs"] = item["ABCDs"].__dict__
-        item["ABCDt"] = item["ABCDt"].__dict__
-
-        if keys_to_keep is None:
-            keys_to_keep = item.keys()
-
-        keys_to_drop = [key for key in item.keys() if key not in keys_to_keep]
-        remove_keys(item, keys_to_drop)
+        for key in ["ABCDs", "ABCDt"]:
+            if key in item:
+                item[key] = item[key].__dict__
 
         outgroup = out.create_group(group_name)
-        save_recursively_to_hdf5(item, outgroup)
+        save_recursively_to_hdf5(item, outgroup, compression, deferred)
 
     return
 
 
-def save_output(retval, file_name, keys_to_keep=None, overwrite=True):
+def save_output(
+    retval, file_name, keys_to_keep=None, overwrite=True, compression=None
+):
     """
     Given the POP simulation output dictionary, a hdf5 file name and the keys to store
     at each surface, it saves the output dictionary along with the paos package information
@@ -182,6 +275,9 @@ def save_output(retval, file_name, keys_to_keep=None, overwrite=True):
         dictionary keys to store at each surface. example: ['amplitude', 'dx', 'dy']
     overwrite: bool
         if True, overwrites past output file
+    compression: str
+        hdf5 compression filter for the 2D arrays (e.g. 'gzip'). If None (default),
+        arrays are stored uncompressed
 
     Returns
     -------
@@ -215,10 +311,13 @@ def save_output(retval, file_name, keys_to_keep=None, overwrite=True):
         if os.path.isfile(file_name):
             os.remove(file_name)
 
+    deferred = [] if compression == "gzip" else None
+
     with h5py.File(file_name, "a") as out:
 
         save_info(file_name, out)
-        save_retval(retval, keys_to_keep, out)
+        save_retval(retval, keys_to_keep, out, compression, deferred)
+        write_deferred(deferred)
 
     logger.info("saving ended.")
 
@@ -226,7 +325,12 @@ def save_output(retval, file_name, keys_to_keep=None, overwrite=True):
 
 
 def save_datacube(
-    retval_list, file_name, group_names, keys_to_keep=None, overwrite=True
+    retval_list,
+    file_name,
+    group_names,
+    keys_to_keep=None,
+    overwrite=True,
+    compression=None,
 ):
     """
     Given a list of dictionaries with POP simulation output, a hdf5 file name, a list of
@@ -236,8 +340,10 @@ def save_datacube(
 
     Parameters
     ----------
-    retval_list: list
-        list of dictionaries with POP simulation outputs to be saved into a single hdf5 file
+    retval_list: list or generator
+        list of dictionaries with POP simulation outputs to be saved into a single hdf5 file.
+        It can also be a generator (e.g. from `Parallel(..., return_as='generator')`): in this
+        case each output is written to file as soon as it is produced and then released
     file_name: str
         the hdf5 file name for saving the POP simulation
     group_names: list
@@ -247,6 +353,9 @@ def save_datacube(
         dictionary keys to store at each surface. example: ['amplitude', 'dx', 'dy]
     overwrite: bool
         if True, overwrites past output file
+    compression: str
+        hdf5 compression filter for the 2D arrays (e.g. 'gzip'). If None (default),
+        arrays are stored uncompressed
 
     Returns
     -------
@@ -273,8 +382,8 @@ def save_datacube(
     """
 
     assert isinstance(
-        retval_list, list
-    ), "parameter retval_list must be a list"
+        retval_list, (list, GeneratorType)
+    ), "parameter retval_list must be a list or a generator"
     assert isinstance(file_name, str), "parameter file_name must be a string"
     assert isinstance(
         group_names, list
@@ -292,6 +401,8 @@ def save_datacube(
         if os.path.exists(file_name) and os.path.isfile(file_name):
             os.remove(file_name)
 
+    deferred = [] if compression == "gzip" else None
+
     with h5py.File(file_name, "a") as cube:
 
         save_info(file_name, cube)
@@ -301,7 +412,15 @@ def save_datacube(
             out = cube.create_group(group_name)
             logger.trace("saving group {}".format(out))
 
-            save_retval(retval, keys_to_keep, out)
+            save_retval(retval, keys_to_keep, out, compression, deferred)
+
+            # Write each group as it comes, so that streamed outputs are not retained
+            write_deferred(deferred)
+            if deferred:
+                deferred.clear()
+            # Flush each completed group to disk, so that the finished groups are
+            # already on disk if the run is interrupted
+            cube.flush()
 
     logger.info("Saving ended.")
 
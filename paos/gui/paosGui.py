@@ -1,20 +1,22 @@
 import configparser
-import copy
 import gc
-import itertools
+import io
+import locale
 import logging
 import os
-import re
 import sys
 import time
+from functools import lru_cache
+from functools import partial
 from typing import List
 from webbrowser import open as openwb
 
 import numpy as np
 from astropy.io import ascii
 from joblib import delayed
+from joblib import effective_n_jobs
 from joblib import Parallel
-from matplotlib import pyplot as plt
+from matplotlib.figure import Figure
 from PySimpleGUI import Button
 from PySimpleGUI import Checkbox
 from PySimpleGUI import Column
@@ -58,12 +60,84 @@ from paos import logger
 from paos import parse_config
 from paos import raytrace
 from paos import run
+from paos import run_wfe
 from paos.core.parseConfig import getfloat
 from paos.core.plot import plot_surface
+from paos.gui.simpleGui import ARROW_EVENTS
 from paos.gui.simpleGui import SimpleGui
 from paos.gui.zernikeGui import ZernikeGui
 from paos.log import setLogLevel
 
+# Time to wait for further surface type changes before applying them, in ms
+_SURFACE_TYPE_DEBOUNCE = 50
+
+# Buttons launching a POP, all disabled while the threaded POP runs
+_POP_LAUNCH_KEYS = ("-POP-", "-POP (nwl)-", "-POP (wfe)-")
+
+# Content of the parsed .ini configuration files, keyed by (path, mtime, size), shared across GUI sessions
+_CONFIG_CACHE = {}
+
+
+def _cache_config(path, stat, config):
+    """
+    Stores the content of the given parser in the configuration cache as that of the .ini file at the given
+    (absolute) path, with the given os.stat result, dropping the outdated content of the same file
+    """
+    for key in [key for key in _CONFIG_CACHE if key[0] == path]:
+        del _CONFIG_CACHE[key]
+    _CONFIG_CACHE[(path, stat.st_mtime_ns, stat.st_size)] = {
+        section: dict(config.items(section, raw=True)) for section in config.sections()
+    }
+
+
+# Lens data editor columns shown as Checkbox widgets
+_CHECKBOX_COLUMNS = frozenset(("Save", "Ignore", "Stop"))
+
+# Par headings of the lens data editor for each surface type, and for any other surface type
+_DEFAULT_PAR_HEADINGS = tuple(f"Par{k}" for k in range(1, 9))
+_PAR_HEADINGS = {
+    "INIT": ("",) * 8,
+    "Standard": ("",) * 8,
+    "Coordinate Break": ("Xdecenter", "Ydecenter", "Xtilt", "Ytilt") + ("",) * 4,
+    "Paraxial Lens": ("Focal length",) + ("",) * 7,
+    "ABCD": ("Ax", "Bx", "Cx", "Dx", "Ay", "By", "Cy", "Dy"),
+    "Zernike": ("Wavelength", "Ordering", "Normalization", "Radius of S.A.", "Origin")
+    + ("",) * 3,
+    "PSD": ("A", "B", "C", "fknee", "fmin", "fmax", "SR", "units"),
+}
+
+# Cell values shown as free text Input widgets (the empty value is used by the wavelengths and fields)
+_INPUT_VALUES = frozenset(("Comment", "Radius", ""))
+
+# Lens data editor columns that are disabled for each surface type
+_DISABLED_COLUMNS = {
+    "INIT": frozenset(
+        ("Radius", "Thickness", "Material", *_CHECKBOX_COLUMNS)
+        + tuple(f"Par{k}" for k in range(1, 9))
+    ),
+    "Coordinate Break": frozenset(
+        ("Radius", "Material", "aperture", "Par5", "Par6", "Par7", "Par8")
+    ),
+    "Standard": frozenset(f"Par{k}" for k in range(1, 9)),
+    "Paraxial Lens": frozenset(
+        ("Radius", "Material") + tuple(f"Par{k}" for k in range(2, 9))
+    ),
+    "ABCD": frozenset(("Radius", "Material")),
+    "Zernike": frozenset(
+        ("Radius", "Thickness", "Material", "aperture", "Par6", "Par7", "Par8")
+    ),
+    "PSD": frozenset(("Radius", "Thickness", "Material", "aperture")),
+}
+
+
+@lru_cache(maxsize=4)
+def _parse_ini_content(path, content):
+    """
+    Parses the .ini configuration file at the given path, just written with the given content.
+    The content only keys the cache, so that e.g. switching back and forth between edits does not reparse
+    """
+    return parse_config(path)
+
 
 class PaosGui(SimpleGui):
     """
@@ -91,6 +165,47 @@ class PaosGui(SimpleGui):
 
     """
 
+    __slots__ = (
+        "passvalue",
+        "font",
+        "event",
+        "values",
+        "wavelengths",
+        "wl_keys",
+        "nrows_wl",
+        "wl_data",
+        "wl_values",
+        "fields",
+        "field_keys",
+        "nrows_field",
+        "field_data",
+        "field_values",
+        "ld_keys",
+        "nrows_ld",
+        "lens_data",
+        "ld_headings",
+        "ld_values",
+        "ld_aperture_keys",
+        "par_headings",
+        "shown_par_headings",
+        "cell_widgets",
+        "lens_cell_table",
+        "row_disabled_columns",
+        "disable_wfe",
+        "disable_wfe_color",
+        "retval",
+        "retval_list",
+        "saving_groups",
+        "figure",
+        "figure_list_nwl",
+        "figure_list_wfe",
+        "surface_zoom",
+        "surface_number",
+        "surface_scale",
+        "temporary_ini",
+        "ini_config",
+    )
+
     def __init__(self, passvalue, font=("Courier New", 16)):
         """
         Initializes the Paos GUI.
@@ -113,12 +228,14 @@ class PaosGui(SimpleGui):
         self.wl_keys = None
         self.nrows_wl = None
         self.wl_data = {"Wavelength": ""}
+        self.wl_values = tuple(self.wl_data.values())
 
         # Fields
         self.fields = None
         self.field_keys = None
         self.nrows_field = None
         self.field_data = {"X": "", "Y": ""}
+        self.field_values = tuple(self.field_data.values())
 
         # Lens data surfaces
         self.ld_keys = None
@@ -173,6 +290,24 @@ class PaosGui(SimpleGui):
             "Par7": "",
             "Par8": "",
         }
+        # Lens data headings and values, computed once for the per-row and per-event lookups
+        self.ld_headings = tuple(self.lens_data.keys())
+        self.ld_values = tuple(self.lens_data.values())
+        # Key prefixes of the aperture tab widgets
+        self.ld_aperture_keys = tuple(
+            name.replace(" ", "_") for name in self.lens_data["aperture"]
+        )
+        self.par_headings = tuple(
+            head for head in self.ld_headings if head.startswith("Par")
+        )
+        # Par headings currently displayed in the lens data editor (None for the default ones)
+        self.shown_par_headings = None
+        # Lens data editor cell keys, by Tk widget (to dispatch the left clicks)
+        self.cell_widgets = {}
+        # Lens data editor cell keys, by row (see lens_cell_keys)
+        self.lens_cell_table = []
+        # Lens data editor columns currently disabled, by row (see _DISABLED_COLUMNS)
+        self.row_disabled_columns = {}
 
         # ------ Define fallback configuration file ------ #
         if "conf" not in self.passvalue.keys() or self.passvalue["conf"] is None:
@@ -190,13 +325,17 @@ class PaosGui(SimpleGui):
         self.surface_number = None
         self.surface_scale = ""
 
+        # ------ Content of the temporary configuration file ------ #
+        self.temporary_ini = None
+
+        # ------ Parser reused by to_ini to write the GUI content ------ #
+        self.ini_config = None
+
     def init_window(self):
         """
         Initializes the main GUI window by parsing the configuration file and initializing the input data dimensions
         """
 
-        # ------ Set up the configuration file parser ------ #
-        self.config = configparser.ConfigParser()
         if "conf" in self.passvalue.keys() and self.passvalue["conf"] is not None:
             if not os.path.exists(self.passvalue["conf"]) or not os.path.isfile(
                 self.passvalue["conf"]
@@ -209,34 +348,43 @@ class PaosGui(SimpleGui):
             logger.debug("Configuration file not found. Exiting..")
             sys.exit()
 
-        # ------ Parse the configuration file ------ #
-        self.config.read(self.passvalue["conf"])
+        # ------ Set up the configuration file parser ------ #
+        self.config = configparser.ConfigParser()
 
-        # ------- Initialize count of wavelengths, fields and optical surfaces ------#
-        self.nrows_wl = (
-            len(self.config["wavelengths"])
-            if "wavelengths" in self.config.keys()
-            else 1
-        )
-        self.nrows_field = (
-            len(self.config["fields"]) if "fields" in self.config.keys() else 1
-        )
-        self.nrows_ld = len(
-            [key for key in self.config.keys() if key.startswith("lens")]
-        )
+        # ------ Parse the configuration file, or reuse its content if unchanged since last parsed ------ #
+        stat = os.stat(self.passvalue["conf"])
+        path = os.path.abspath(self.passvalue["conf"])
+        cache_key = (path, stat.st_mtime_ns, stat.st_size)
+        if cache_key not in _CONFIG_CACHE:
+            config = configparser.ConfigParser()
+            config.read(self.passvalue["conf"])
+            _cache_config(path, stat, config)
+        # A fresh parser is filled for each session, since the GUI edits it
+        self.config.read_dict(_CONFIG_CACHE[cache_key])
+
+        # ------- Initialize count of wavelengths, fields and optical surfaces, in a single pass ------#
+        sections = _CONFIG_CACHE[cache_key]
+        self.nrows_wl, self.nrows_field, self.nrows_ld = 1, 1, 0
+        for section, options in sections.items():
+            if section == "wavelengths":
+                self.nrows_wl = len(self.config[section])
+            elif section == "fields":
+                self.nrows_field = len(self.config[section])
+            elif section.startswith("lens"):
+                self.nrows_ld += 1
+                # Any Zernike surface that is not ignored enables the wfe frame
+                if (
+                    self.disable_wfe
+                    and "Zernike" in options.values()
+                    and not self.config[section].getboolean("ignore")
+                ):
+                    self.disable_wfe = False
 
         # ------- Initialize keys of wavelengths, fields and surfaces ------#
         self.wl_keys = [f"w{k}" for k in range(1, self.nrows_wl + 1)]
         self.field_keys = [f"f{k}" for k in range(1, self.nrows_field + 1)]
         self.ld_keys = [f"S{k}" for k in range(1, self.nrows_ld + 1)]
 
-        for key, item in self.config.items():
-            if key.startswith("lens"):
-                for subkey, subitem in item.items():
-                    if subitem == "Zernike" and not self.config[key].getboolean(
-                        "ignore"
-                    ):
-                        self.disable_wfe = False
         self.disable_wfe_color = "gray" if self.disable_wfe else "blue"
 
     def get_widget(self, value, key, item, size=(24, 2)):
@@ -260,10 +408,12 @@ class PaosGui(SimpleGui):
             the desired Widget
         """
 
-        default = item if item != "NaN" else None
-        disabled = False if item != "NaN" else True
+        disabled = item == "NaN"
+        default = None if disabled else item
 
-        if value in ["Save", "Ignore", "Stop"]:
+        # The Checkbox and Input cells are given by name, the Combo cells by their (unhashable) list of options
+        is_name = isinstance(value, str)
+        if is_name and value in _CHECKBOX_COLUMNS:
             return Checkbox(
                 text=value,
                 default=default,
@@ -272,7 +422,7 @@ class PaosGui(SimpleGui):
                 disabled=disabled,
                 enable_events=True,
             )
-        elif value in ["Comment", "Radius", ""]:
+        elif is_name and value in _INPUT_VALUES:
             return InputText(
                 default_text=default, key=key, size=size, disabled=disabled
             )
@@ -305,17 +455,19 @@ class PaosGui(SimpleGui):
         out: List[List[Text], List[Checkbox or Input or Column or Combo]]
             list of widgets with the aperture parameters names and values
         """
-        config_key = "lens_{:02d}".format(row)
+        config_key = f"lens_{row:02d}"
         aperture = None
-        if config_key in self.config.keys():
+        if self.config.has_section(config_key):
             aperture = self.config[config_key].get("aperture", None)
             aperture = aperture if aperture != "" else None
         if aperture is not None:
             aperture = aperture.split(",")
 
         tab = []
-        for k, (key, item) in enumerate(self.lens_data["aperture"].items()):
-            key_item = key.replace(" ", "_") + f"_({row},{col})"
+        for k, ((key, item), name_key) in enumerate(
+            zip(self.lens_data["aperture"].items(), self.ld_aperture_keys)
+        ):
+            key_item = f"{name_key}_({row},{col})"
             config_item = "" if aperture is None else aperture[k]
 
             tab.append([Text(key, size=(20, 1))])
@@ -351,8 +503,7 @@ class PaosGui(SimpleGui):
 
         """
 
-        cell = re.findall("[0-9]+", key.partition("_")[-1])
-        row, col = tuple(map(int, cell))
+        row, col = self.get_cell(key)
 
         button_symbol = self.symbol_disabled if disabled else self.triangle_right
         text_color = "gray" if disabled else "yellow"
@@ -377,7 +528,10 @@ class PaosGui(SimpleGui):
                 [
                     self.collapse_frame(
                         title="",
-                        layout=[[Column(layout=self.fill_aperture_tab(row, col))]],
+                        # Filled by build_aperture_tab when first opened
+                        layout=[
+                            [Column(layout=[[]], key=f"LD_Tab_Content_({row},{col})")]
+                        ],
                         key=f"LD_Tab_({row},{col})",
                     )
                 ],
@@ -387,6 +541,107 @@ class PaosGui(SimpleGui):
 
         return surface_tab_layout
 
+    def build_aperture_tab(self, row, col):
+        """
+        Given the row and column corresponding to the aperture cell in the GUI lens data editor, fills its
+        collapsed tab with the aperture parameters widgets, unless already done.
+        The tabs are built on demand, since most of them are never opened
+
+        Parameters
+        ----------
+        row: int
+            row corresponding to the optical surface in the GUI lens data editor
+        col: int
+            column corresponding to the aperture header in the GUI lens data editor
+
+        Returns
+        -------
+        out: None
+            fills the aperture tab
+        """
+        if f"{self.ld_aperture_keys[0]}_({row},{col})" in self.window.key_dict:
+            return
+
+        self.window.extend_layout(
+            self.window[f"LD_Tab_Content_({row},{col})"],
+            self.fill_aperture_tab(row, col),
+        )
+
+        return
+
+    def apply_surface_type(self, row):
+        """
+        Given the lens data editor row, applies its surface type: updates the headings, enables/disables the row
+        widgets (see lens_data_rules) and, for a Zernike surface, offers to edit its coefficients
+
+        Parameters
+        ----------
+        row: int
+            the lens data editor row
+
+        Returns
+        -------
+        out: None
+            updates the lens data editor row
+        """
+        surface_type_key = f"SurfaceType_({row},0)"
+        # Update the headings for the new surface type
+        self.update_headings(row)
+        # Apply the pre-defined rules for the lens data editor (see lens_data_rules) to enable/disable
+        # the row widgets
+        disabled_columns = _DISABLED_COLUMNS.get(self.values[surface_type_key], ())
+        previous_columns = self.row_disabled_columns.get(row)
+        self.row_disabled_columns[row] = disabled_columns
+        cell_keys = self.lens_cell_keys(row)
+        # Loop through all widgets in the current row
+        for c, key in enumerate(self.ld_headings):
+            disabled = key in disabled_columns
+            # Only update the widgets whose state changes with the surface type
+            if previous_columns is not None and disabled == (key in previous_columns):
+                continue
+            if key == "aperture":
+                item_column_key = f"-OPEN TAB APERTURE-({row},{c})"
+                # Update triangle symbol
+                self.window[item_column_key].update(
+                    self.symbol_disabled if disabled else self.triangle_right
+                )
+                title_column_key = f"LD_Tab_Title_({row},8)"
+                text_color = "gray" if disabled else "yellow"
+                # Update aperture text color
+                self.window[title_column_key].update(text_color=text_color)
+            else:
+                item_column_key = cell_keys[c]
+            # Enable/disable the row widgets
+            self.window[item_column_key].update(disabled=disabled)
+
+        # Only if the selected surface type is Zernike...
+        if self.values[surface_type_key] == "Zernike":
+            # Display popup to select action
+            action = popup_ok_cancel(
+                "Insert/Edit Zernike coefficients", keep_on_top=True
+            )
+            if action == "OK":
+                key = "lens_{:02d}".format(int(row))
+                # Launch the Zernike GUI editor
+                zernike = ZernikeGui(
+                    config=self.config,
+                    values=self.values,
+                    row=row,
+                    key=key,
+                )()
+                if self.config.has_section(key):
+                    # Update the zernike values in the config object
+                    self.config[key].update(zernike)
+                else:
+                    # Create ex-novo the zernike values in the config object
+                    for subkey, subitem in zernike.items():
+                        self.config.set(key, subkey, subitem)
+                # Update the zernike ordering (relevant only if previously not indicated)
+                col = self.ld_headings.index("Par2")
+                self.window[f"Par2_({row},{col})"].update(zernike["ordering"])
+
+        return
+
     @staticmethod
     def par_heading_rules(surface_type):
         """
@@ -399,61 +654,11 @@ class PaosGui(SimpleGui):
 
         Returns
         -------
-        out: List[str] or None
-            the desired list of headers
+        out: tuple(str)
+            the desired headers
         """
 
-        headings = [
-            "Par1",
-            "Par2",
-            "Par3",
-            "Par4",
-            "Par5",
-            "Par6",
-            "Par7",
-            "Par8",
-        ]
-        if surface_type in ["INIT", "Standard"]:
-            headings = ["", "", "", "", "", "", "", ""]
-        elif surface_type == "Coordinate Break":
-            headings = [
-                "Xdecenter",
-                "Ydecenter",
-                "Xtilt",
-                "Ytilt",
-                "",
-                "",
-                "",
-                "",
-            ]
-        elif surface_type == "Paraxial Lens":
-            headings = ["Focal length", "", "", "", "", "", "", ""]
-        elif surface_type == "ABCD":
-            headings = ["Ax", "Bx", "Cx", "Dx", "Ay", "By", "Cy", "Dy"]
-        elif surface_type == "Zernike":
-            headings = [
-                "Wavelength",
-                "Ordering",
-                "Normalization",
-                "Radius of S.A.",
-                "Origin",
-                "",
-                "",
-                "",
-            ]
-        elif surface_type == "PSD":
-            headings = [
-                "A",
-                "B",
-                "C",
-                "fknee",
-                "fmin",
-                "fmax",
-                "SR",
-                "units"
-            ]
-
-        return headings
+        return _PAR_HEADINGS.get(surface_type, _DEFAULT_PAR_HEADINGS)
 
     def highlight_row(self, row, selected_row):
         """
@@ -492,18 +697,18 @@ class PaosGui(SimpleGui):
             Updates the headers
         """
         par_headings = self.par_heading_rules(self.values[f"SurfaceType_({row},0)"])
-        old_par_headings = [
-            "Par1",
-            "Par2",
-            "Par3",
-            "Par4",
-            "Par5",
-            "Par6",
-            "Par7",
-            "Par8",
-        ]
-        for head, new_head in zip(old_par_headings, par_headings):
-            self.window[head].update(new_head)
+        # The rules return shared tuples: this is (almost always) an identity check
+        if par_headings == self.shown_par_headings:
+            return
+        shown_par_headings = self.shown_par_headings or self.par_headings
+        # Only update the headings that change (e.g. none when moving within rows of the same surface type)
+        elements = self.window.key_dict
+        for head, shown_head, new_head in zip(
+            self.par_headings, shown_par_headings, par_headings
+        ):
+            if new_head != shown_head:
+                elements[head].update(new_head)
+        self.shown_par_headings = par_headings
 
         return
 
@@ -526,48 +731,7 @@ class PaosGui(SimpleGui):
         out: bool or str
             the item to put in the cell widget
         """
-        if surface_type == "INIT" and header.startswith(
-            (
-                "Radius",
-                "Thickness",
-                "Material",
-                "Save",
-                "Ignore",
-                "Stop",
-                "Par",
-            )
-        ):
-            item = "NaN"
-
-        elif surface_type == "Coordinate Break" and (
-            header.startswith(("Radius", "Material", "aperture"))
-            or header.startswith(("Par5", "Par6", "Par7", "Par8"))
-        ):
-            item = "NaN"
-
-        elif surface_type == "Standard" and header.startswith("Par"):
-            item = "NaN"
-
-        elif surface_type == "Paraxial Lens" and (
-            header.startswith(("Radius", "Material"))
-            or header.startswith(
-                ("Par2", "Par3", "Par4", "Par5", "Par6", "Par7", "Par8")
-            )
-        ):
-            item = "NaN"
-
-        elif surface_type == "ABCD" and header.startswith(("Radius", "Material")):
-            item = "NaN"
-
-        elif surface_type == "Zernike" and (
-            header.startswith(("Radius", "Thickness", "Material", "aperture"))
-            or header.startswith(("Par6", "Par7", "Par8"))
-        ):
-            item = "NaN"
-
-        elif surface_type == "PSD" and (
-            header.startswith(("Radius", "Thickness", "Material", "aperture"))
-        ):
+        if header.partition("_")[0] in _DISABLED_COLUMNS.get(surface_type, ()):
             item = "NaN"
 
         return item
@@ -593,71 +757,69 @@ class PaosGui(SimpleGui):
         out: List[Text, List[Checkbox or Input or Column or Combo]]
             list of widgets to fill a GUI editor data row
         """
-        row_widget = [Text(row, size=(6, 1), key=f"row idx {row}")]
+        row_widget = Text(row, size=(6, 1), key=f"row idx {row}")
 
         if prefix == "w":
             key = f"{prefix}{row}"
             item = self.config["wavelengths"].get(key, "")
-            return list(
-                itertools.chain(
-                    row_widget,
-                    [self.get_widget(value, key, item) for value in input_list],
-                )
-            )
+            return [
+                row_widget,
+                *(self.get_widget(value, key, item) for value in input_list),
+            ]
 
         elif prefix == "f":
             key = f"{prefix}{row}"
             items = self.config["fields"].get(key, "0.0,0.0").split(",")
-            keys = ["_".join([key, str(i)]) for i in range(len(items))]
-            return list(
-                itertools.chain(
-                    row_widget,
-                    [
-                        self.get_widget(value, key, item)
-                        for value, key, item in zip(input_list, keys, items)
-                    ],
-                )
-            )
+            return [
+                row_widget,
+                *(
+                    self.get_widget(value, f"{key}_{i}", item)
+                    for i, (value, item) in enumerate(zip(input_list, items))
+                ),
+            ]
 
         elif prefix == "l":
-            key = "lens_{:02d}".format(row)
-
-            lens_dict = {}
-            for c, name in enumerate(self.lens_data.keys()):
-                name_key = f"{name}_({row},{c})"
-                lens_dict[name_key] = None
-                if key in self.config.keys() and name in self.config[key].keys():
-                    if name in ["Save", "Ignore", "Stop"]:
-                        lens_dict[name_key] = self.config[key].getboolean(name)
+            key = f"lens_{row:02d}"
+            # Read the row options at once (interpolated, as section[name] would), instead of probing
+            # the section proxy for each cell. The option names are case-normalized by the parser
+            options = (
+                dict(self.config.items(key)) if self.config.has_section(key) else {}
+            )
+            option_names = map(self.config.optionxform, self.ld_headings)
+            # The surface type, hence the disabled columns (see lens_data_rules), are the same for the whole row
+            surface_type = options.get(self.config.optionxform("SurfaceType"))
+            disabled_columns = _DISABLED_COLUMNS.get(surface_type, ())
+            self.row_disabled_columns[row] = disabled_columns
+
+            # Build the row in a single pass over the headings
+            row_widgets = [row_widget]
+            for value, name, option, name_key in zip(
+                input_list, self.ld_headings, option_names, self.lens_cell_keys(row)
+            ):
+                item = None
+                if name in disabled_columns:
+                    item = "NaN"
+                elif option in options:
+                    if name in _CHECKBOX_COLUMNS:
+                        item = self.config.getboolean(key, name)
                     else:
-                        lens_dict[name_key] = self.config[key][name]
+                        item = options[option]
 
-                surface_type = lens_dict[f"SurfaceType_({row},0)"]
-                lens_dict[name_key] = self.lens_data_rules(
-                    surface_type=surface_type,
-                    header=name_key,
-                    item=lens_dict[name_key],
-                )
+                row_widgets.append(self.get_widget(value, name_key, item))
 
-            return list(
-                itertools.chain(
-                    row_widget,
-                    [
-                        self.get_widget(value, key, item)
-                        for value, (key, item) in zip(input_list, lens_dict.items())
-                    ],
-                )
-            )
+            return row_widgets
 
-    def add_row(self, column_key):
+    def add_row(self, column_key, count=1):
         """
-        Given the Column key, it updates the current Column by adding a row.
+        Given the Column key, it updates the current Column by adding a row, or several rows at once.
         For example, can add a row to the wavelength Column.
 
         Parameters
         ----------
         column_key: str
             key for the Column widget to which we want to add a row
+        count: int
+            number of rows to add. They are added with a single layout update
 
         Returns
         -------
@@ -669,42 +831,137 @@ class PaosGui(SimpleGui):
 
         if column_key == "wavelengths":
             nrows = self.nrows_wl
-            input_list = [""]
+            input_list = self.wl_values
         elif column_key == "fields":
             nrows = self.nrows_field
-            input_list = ["", ""]
+            input_list = self.field_values
         elif column_key == "lenses":
             nrows = self.nrows_ld
-            input_list = [item for key, item in self.lens_data.items()]
+            input_list = self.ld_values
         else:
             logger.error("Key error")
 
-        nrows += 1
+        new_rows = range(nrows + 1, nrows + count + 1)
 
         if column_key == "lenses":
-            new_row = [
+            new_layout = [
                 [
                     Frame(
                         "",
-                        layout=[self.chain_widgets(nrows, input_list, prefix)],
-                        key=f"{column_key}_{nrows:02d}",
+                        layout=[self.chain_widgets(row, input_list, prefix)],
+                        key=f"{column_key}_{row:02d}",
                         relief=RELIEF_FLAT,
                     )
                 ]
+                for row in new_rows
             ]
         else:
-            new_row = [self.chain_widgets(nrows, input_list, prefix)]
+            new_layout = [
+                self.chain_widgets(row, input_list, prefix) for row in new_rows
+            ]
 
-        # Extend the Column layout
-        self.window.extend_layout(self.window[column_key], new_row)
-        self.window[column_key].update()
+        # Extend the Column layout, all rows at once. The window is refreshed once by the caller,
+        # when updating the Column scrollbar
+        self.window.extend_layout(self.window[column_key], new_layout)
 
         if column_key == "lenses":
-            self.config.add_section("lens_{:02d}".format(nrows))
-            for c, head in enumerate(self.lens_data.keys()):
-                self.window[f"{head}_({nrows},{c})"].bind("<Button-1>", "_LeftClick")
+            for row in new_rows:
+                self.config.add_section(f"lens_{row:02d}")
+            self.index_lens_cells(new_rows)
+
+        return nrows + count
+
+    def lens_cell_keys(self, row):
+        """
+        Given the lens data editor row, returns the keys of its cells. The keys are interned and
+        computed once, then reused by the widget creation, the event loop and the Save
+
+        Parameters
+        ----------
+        row: int
+            the lens data editor row
+
+        Returns
+        -------
+        out: tuple of str
+            the cell keys, in the order of the lens data headings
+        """
+        table = self.lens_cell_table
+        # Grow the table on demand, e.g. when rows are added
+        for r in range(len(table), row + 1):
+            table.append(
+                tuple(
+                    sys.intern(f"{head}_({r},{c})")
+                    for c, head in enumerate(self.ld_headings)
+                )
+            )
+
+        return table[row]
+
+    def cell_key(self, row, col, values):
+        """
+        Given the row and column of a lens data editor cell and the dictionary containing the window values,
+        returns the cell key, straight from the lens data editor key table (see lens_cell_keys)
 
-        return nrows
+        Parameters
+        ----------
+        row: int
+            the cell row
+        col: int
+            the cell column
+        values: dict
+            the dictionary containing the window values
+
+        Returns
+        -------
+        out: str or None
+            the cell key, or None if there is no such cell
+        """
+        key = self.lens_cell_keys(row)[col]
+        return key if key in values else None
+
+    def index_lens_cells(self, rows):
+        """
+        Given the lens data editor rows, maps the Tk widgets of their cells to the cell keys, for
+        :meth:`~PaosGui.on_left_click`
+
+        Parameters
+        ----------
+        rows: iterable of int
+            the lens data editor rows to index
+
+        Returns
+        -------
+        out: None
+            updates the cell widgets index
+        """
+        elements = self.window.key_dict
+        for r in rows:
+            for key in self.lens_cell_keys(r):
+                self.cell_widgets[elements[key].Widget] = key
+
+        return
+
+    def on_left_click(self, event):
+        """
+        Tk callback for the left mouse clicks: if the clicked widget is a lens data editor cell,
+        generates the '-LD CELL CLICK-' GUI event, with the cell key as its value
+
+        Parameters
+        ----------
+        event: Event
+            the Tk event
+
+        Returns
+        -------
+        out: None
+            generates the GUI event
+        """
+        key = self.cell_widgets.get(event.widget)
+        if key is not None:
+            self.window.write_event_value("-LD CELL CLICK-", key)
+
+        return
 
     def update_wfe_frame(self):
         """
@@ -717,16 +974,14 @@ class PaosGui(SimpleGui):
             updates the Wfe Frame
 
         """
-        disable_wfe = []
-        for key, item in self.values.items():
-            if item == "Zernike":
-                row, col = re.findall("[0-9]+", key)
-                if self.values[f"Ignore_({row},6)"]:
-                    disable_wfe.append(True)
-                else:
-                    disable_wfe.append(False)
-
-        self.disable_wfe = False if False in disable_wfe else True
+        # A single pass over the SurfaceType cells, rather than over all the window values,
+        # stopping at the first Zernike surface that is not ignored
+        ignore_col = self.ld_headings.index("Ignore")
+        self.disable_wfe = not any(
+            self.values[cell_keys[0]] == "Zernike"
+            and not self.values[cell_keys[ignore_col]]
+            for cell_keys in map(self.lens_cell_keys, range(1, self.nrows_ld + 1))
+        )
         self.disable_wfe_color = "gray" if self.disable_wfe else "blue"
 
         self.window["-OPEN FRAME MC (wfe)-"].update(disabled=self.disable_wfe)
@@ -759,8 +1014,7 @@ class PaosGui(SimpleGui):
         # Clear Image elements
         for image_key in ["-IMAGE-", "-IMAGE (nwl)-", "-IMAGE (wfe)-"]:
             self.clear_image(self.window[image_key])
-        # Close matplotlib plots
-        plt.close("all")
+        # Free the memory of the previous figures and outputs
         _ = gc.collect()
         # Reset progress bars
         _ = self.reset_progress_bar(self.window["progbar"])
@@ -787,56 +1041,66 @@ class PaosGui(SimpleGui):
             the GUI input content as a dictionary
         """
 
+        values = self.values
+
         # ------- Get general data ------#
         dictionary = {
             "general": {
-                "project": self.values["project"],
-                "version": self.values["version"],
-                "grid_size": self.values["grid_size"],
-                "zoom": self.values["zoom"],
-                "lens_unit": self.values["lens_unit"],
-                "Tambient": self.values["tambient"],
-                "Pambient": self.values["pambient"],
+                "project": values["project"],
+                "version": values["version"],
+                "grid_size": values["grid_size"],
+                "zoom": values["zoom"],
+                "lens_unit": values["lens_unit"],
+                "Tambient": values["tambient"],
+                "Pambient": values["pambient"],
             }
         }
 
         # ------- Get wavelengths data ------#
-        key = "wavelengths"
-        dictionary[key] = {}
-        for k in range(1, self.nrows_wl + 1):
-            if self.values[f"w{k}"] != "":
-                dictionary[key][f"w{k}"] = self.values[f"w{k}"]
+        dictionary["wavelengths"] = {
+            f"w{k}": values[f"w{k}"]
+            for k in range(1, self.nrows_wl + 1)
+            if values[f"w{k}"] != ""
+        }
 
         # ------- Get fields data ------#
-        key = "fields"
-        dictionary[key] = {}
-        for k in range(1, self.nrows_field + 1):
-            fields = [
-                self.values[f"f{k}_{c}"] for c in range(len(self.field_data.keys()))
-            ]
-            dictionary[key][f"f{k}"] = ",".join(map(str, fields))
+        ncols_field = len(self.field_data)
+        # The Input widget values are already strings
+        dictionary["fields"] = {
+            f"f{k}": ",".join([values[f"f{k}_{c}"] for c in range(ncols_field)])
+            for k in range(1, self.nrows_field + 1)
+        }
 
         # ------- Get lens data editor data ------#
+        aperture_keys = self.ld_aperture_keys
         for k in range(1, self.nrows_ld + 1):
-            key = "lens_{:02d}".format(k)
-            dictionary[key] = {}
-            for c, head in enumerate(self.lens_data.keys()):
-                section = dictionary[key]
+            key = f"lens_{k:02d}"
+            section = dictionary[key] = {}
+            cell_keys = self.lens_cell_keys(k)
+            for c, head in enumerate(self.ld_headings):
                 if head == "aperture":
-                    section[head] = ",".join(
-                        [
-                            self.values[f'{name_key.replace(" ", "_")}_({k},{c})']
-                            for name_key in self.lens_data["aperture"].keys()
-                        ]
-                    )
-                    if section[head] == len(section[head]) * ",":
-                        section[head] = ""
+                    if f"{aperture_keys[0]}_({k},{c})" in values:
+                        item = ",".join(
+                            [
+                                values[f"{name_key}_({k},{c})"]
+                                for name_key in aperture_keys
+                            ]
+                        )
+                    else:
+                        # The aperture tab was never opened: its widgets would hold the configuration values
+                        item = (
+                            self.config[key].get("aperture", "")
+                            if self.config.has_section(key)
+                            else ""
+                        )
+                    # Empty if only made of separators
+                    section[head] = item if item.strip(",") else ""
                 else:
-                    section[head] = self.values[f"{head}_({k},{c})"]
-                    if section[head] == "Zernike":
-                        section["zindex"] = self.config[key].get("zindex", "0")
-                        section["z"] = self.config[key].get("z", "0")
-                dictionary[key].update(section)
+                    item = section[head] = values[cell_keys[c]]
+                    if item == "Zernike":
+                        config_section = self.config[key]
+                        section["zindex"] = config_section.get("zindex", "0")
+                        section["z"] = config_section.get("z", "0")
 
         if show:
             popup_scrolled(
@@ -864,7 +1128,12 @@ class PaosGui(SimpleGui):
         out: None
             writes the data content from the GUI input Tabs to a .ini file
         """
-        config = self.to_configparser(dictionary=self.save_to_dict(show=False))
+        self.ini_config = self.to_configparser(
+            dictionary=self.save_to_dict(show=False), config=self.ini_config
+        )
+        with io.StringIO() as buffer:
+            self.ini_config.write(buffer)
+            content = buffer.getvalue()
 
         if filename is not None:
             pass
@@ -873,13 +1142,57 @@ class PaosGui(SimpleGui):
                 os.path.dirname(self.passvalue["conf"]),
                 "".join(["temp_", os.path.basename(self.passvalue["conf"])]),
             )
+            # Leave the temporary file (and its mtime) untouched if its content did not change
+            if content == self.temporary_ini and os.path.isfile(filename):
+                return
+            self.temporary_ini = content
         else:
             filename = self.passvalue["conf"]
 
-        with open(filename, "w") as cf:
-            config.write(cf)
+        # Translate the line endings and encode once, as a text mode file would, and do the file I/O in binary mode
+        data = content.replace("\n", os.linesep).encode(
+            locale.getpreferredencoding(False)
+        )
+
+        if not temporary:
+            # Leave the file (and its mtime) untouched if it already has this content, e.g. when saving
+            # right after opening it or twice in a row. The size is compared first, to skip reading the file
+            # whenever it differs
+            try:
+                if os.path.getsize(filename) == len(data):
+                    with open(filename, "rb") as cf:
+                        if cf.read() == data:
+                            logger.debug(f"No changes to save to {filename}")
+                            return
+            except OSError:
+                pass
+
+        # Write the whole content at once to a temporary file, then rename it over the target,
+        # so that an interrupted save never leaves a truncated configuration file behind
+        with open(f"{filename}.tmp", "wb") as cf:
+            cf.write(data)
+        os.replace(f"{filename}.tmp", filename)
+
+        if not temporary:
+            # The content of the saved file is known: cache it, so that opening the file next does not parse it
+            _cache_config(os.path.abspath(filename), os.stat(filename), self.ini_config)
         return
 
+    def parse_temporary_config(self):
+        """
+        Saves the GUI content to the temporary .ini configuration file and parses it, reusing the output of a
+        previous parse of the same content.
+        The temporary file is only written here, when a simulation needs it, rather than at every GUI event
+
+        Returns
+        -------
+        out: tuple
+            the output of paos.core.parseConfig.parse_config for the temporary configuration file
+        """
+        self.to_ini(temporary=True)
+
+        return _parse_ini_content(self.temporary_config, self.temporary_ini)
+
     def draw_surface(
         self,
         retval_list,
@@ -928,13 +1241,10 @@ class PaosGui(SimpleGui):
 
         Notes
         -----
-        Do not plot too many figures (> 20) at a time, otherwise they may occupy too much memory, and you will get
-        a warning from matplotlib for reached maximum number of opened figures
+        Do not plot too many figures (> 20) at a time, otherwise they may occupy too much memory.
+        The figures are not managed by pyplot: they are only rendered offscreen, so they need no backend window
         """
 
-        # Close all previous plots
-        plt.close("all")
-
         zoom = getfloat(self.values[zoom_key])
         if np.isnan(zoom):
             logger.warning("The input zoom value is not a scalar")
@@ -966,7 +1276,13 @@ class PaosGui(SimpleGui):
                 # Plot
                 logger.debug(f"Plotting POP for group {group}")
                 figure_list.append(
-                    plot_surface(key=key, retval=ret, ima_scale=ima_scale, zoom=zoom)
+                    plot_surface(
+                        key=key,
+                        retval=ret,
+                        ima_scale=ima_scale,
+                        zoom=zoom,
+                        fig=Figure(figsize=(12, 6)),
+                    )
                 )
                 # Get the index of the plotted figures
                 idx.append(j)
@@ -985,7 +1301,13 @@ class PaosGui(SimpleGui):
                 )
                 return
             # Plot
-            fig = plot_surface(key=key, retval=ret, ima_scale=ima_scale, zoom=zoom)
+            fig = plot_surface(
+                key=key,
+                retval=ret,
+                ima_scale=ima_scale,
+                zoom=zoom,
+                fig=Figure(figsize=(12, 6)),
+            )
             return fig
 
     def display_plot_slide(self, figure_list, figure_agg, image_key, slider_key):
@@ -1048,7 +1370,7 @@ class PaosGui(SimpleGui):
                 Frame(
                     "General Setup",
                     layout=[
-                        [Text("", size=(24, 1))],
+                        [self.spacer(24, 1)],
                         [
                             Text("Project Name:", size=(24, 1)),
                             InputText(
@@ -1159,7 +1481,7 @@ class PaosGui(SimpleGui):
                                 disabled=True,
                             ),
                         ],
-                        [Text("", size=(24, 1))],
+                        [self.spacer(24, 1)],
                     ],
                     font=self.font_titles,
                     relief=RELIEF_SUNKEN,
@@ -1171,77 +1493,69 @@ class PaosGui(SimpleGui):
                 Frame(
                     "Wavelength Setup",
                     layout=[
-                        [Text("", size=(24, 1))],
-                        list(
-                            itertools.chain(
-                                [
-                                    Frame(
-                                        "Wavelengths Actions",
-                                        layout=[
-                                            [
-                                                Text(
-                                                    "Add a wavelength: ",
-                                                    size=(24, 1),
-                                                ),
-                                                Button(
-                                                    tooltip="Click to add wavelength",
-                                                    button_text="Add",
-                                                    enable_events=True,
-                                                    key="-ADD WAVELENGTH-",
-                                                ),
-                                            ],
-                                            [
-                                                Text(
-                                                    "Paste wavelengths: ",
-                                                    size=(24, 1),
-                                                ),
-                                                Button(
-                                                    tooltip="Click to paste wavelengths",
-                                                    button_text="Paste",
-                                                    enable_events=True,
-                                                    key="-PASTE WL-",
-                                                ),
-                                            ],
-                                            [
-                                                Text(
-                                                    "Sort wavelengths: ",
-                                                    size=(24, 1),
-                                                ),
-                                                Button(
-                                                    tooltip="Click to sort wavelengths",
-                                                    button_text="Sort",
-                                                    enable_events=True,
-                                                    key="-SORT WL-",
-                                                ),
-                                            ],
-                                        ],
-                                        font=self.font_titles,
-                                        relief=RELIEF_SUNKEN,
-                                        key="GENERAL ACTIONS FRAME",
-                                    )
-                                ],
-                                [Text("", size=(15, 1))],
-                                [
-                                    Column(
-                                        layout=list(
-                                            itertools.chain(
-                                                [self.add_heading(self.wl_data.keys())],
-                                                [
-                                                    self.chain_widgets(
-                                                        r, [""], prefix="w"
-                                                    )
-                                                    for r in range(1, self.nrows_wl + 1)
-                                                ],
-                                            )
+                        [self.spacer(24, 1)],
+                        [
+                            Frame(
+                                "Wavelengths Actions",
+                                layout=[
+                                    [
+                                        Text(
+                                            "Add a wavelength: ",
+                                            size=(24, 1),
+                                        ),
+                                        Button(
+                                            tooltip="Click to add wavelength",
+                                            button_text="Add",
+                                            enable_events=True,
+                                            key="-ADD WAVELENGTH-",
+                                        ),
+                                    ],
+                                    [
+                                        Text(
+                                            "Paste wavelengths: ",
+                                            size=(24, 1),
+                                        ),
+                                        Button(
+                                            tooltip="Click to paste wavelengths",
+                                            button_text="Paste",
+                                            enable_events=True,
+                                            key="-PASTE WL-",
+                                        ),
+                                    ],
+                                    [
+                                        Text(
+                                            "Sort wavelengths: ",
+                                            size=(24, 1),
+                                        ),
+                                        Button(
+                                            tooltip="Click to sort wavelengths",
+                                            button_text="Sort",
+                                            enable_events=True,
+                                            key="-SORT WL-",
                                         ),
-                                        key="wavelengths",
-                                        scrollable=True,
-                                        vertical_scroll_only=True,
-                                        expand_y=True,
-                                    )
+                                    ],
                                 ],
-                            )
-                        ),
+                                font=self.font_titles,
+                                relief=RELIEF_SUNKEN,
+                                key="GENERAL ACTIONS FRAME",
+                            ),
+                            self.spacer(15, 1),
+                            Column(
+                                layout=[
+                                    self.add_heading(self.wl_data.keys()),
+                                    *(
+                                        self.chain_widgets(
+                                            r, self.wl_values, prefix="w"
+                                        )
+                                        for r in range(1, self.nrows_wl + 1)
+                                    ),
+                                ],
+                                key="wavelengths",
+                                scrollable=True,
+                                vertical_scroll_only=True,
+                                expand_y=True,
+                            ),
+                        ],
                     ],
                     font=self.font_titles,
                     relief=RELIEF_SUNKEN,
@@ -1258,18 +1572,18 @@ class PaosGui(SimpleGui):
                 Frame(
                     "Fields Setup",
                     layout=[
-                        [Text("", size=(24, 1))],
+                        [self.spacer(24, 1)],
                         [
                             Column(
-                                layout=list(
-                                    itertools.chain(
-                                        [self.add_heading(self.field_data.keys())],
-                                        [
-                                            self.chain_widgets(r, ["", ""], prefix="f")
-                                            for r in range(1, self.nrows_field + 1)
-                                        ],
-                                    )
-                                ),
+                                layout=[
+                                    self.add_heading(self.field_data.keys()),
+                                    *(
+                                        self.chain_widgets(
+                                            r, self.field_values, prefix="f"
+                                        )
+                                        for r in range(1, self.nrows_field + 1)
+                                    ),
+                                ],
                                 scrollable=True,
                                 vertical_scroll_only=True,
                                 expand_x=True,
@@ -1313,35 +1627,30 @@ class PaosGui(SimpleGui):
                 Frame(
                     "Lens Data Setup",
                     layout=[
-                        [Text("", size=(24, 1))],
+                        [self.spacer(24, 1)],
                         [
                             Column(
-                                layout=list(
-                                    itertools.chain(
-                                        [self.add_heading(self.lens_data.keys())],
-                                        [[Text("")]],
+                                layout=[
+                                    self.add_heading(self.ld_headings),
+                                    [Text("")],
+                                    *(
                                         [
-                                            [
-                                                Frame(
-                                                    "",
-                                                    layout=[
-                                                        self.chain_widgets(
-                                                            r,
-                                                            [
-                                                                item
-                                                                for key, item in self.lens_data.items()
-                                                            ],
-                                                            prefix="l",
-                                                        )
-                                                    ],
-                                                    key=f"lenses_{r:02d}",
-                                                    relief=RELIEF_FLAT,
-                                                )
-                                            ]
-                                            for r in range(1, self.nrows_ld + 1)
-                                        ],
-                                    )
-                                ),
+                                            Frame(
+                                                "",
+                                                layout=[
+                                                    self.chain_widgets(
+                                                        r,
+                                                        self.ld_values,
+                                                        prefix="l",
+                                                    )
+                                                ],
+                                                key=f"lenses_{r:02d}",
+                                                relief=RELIEF_FLAT,
+                                            )
+                                        ]
+                                        for r in range(1, self.nrows_ld + 1)
+                                    ),
+                                ],
                                 scrollable=True,
                                 expand_x=True,
                                 expand_y=True,
@@ -1387,228 +1696,216 @@ class PaosGui(SimpleGui):
                             Frame(
                                 "Select inputs",
                                 layout=[
-                                    list(
-                                        itertools.chain(
-                                            [
-                                                Text(
-                                                    "Select wavelength",
-                                                    size=(12, 2),
-                                                ),
-                                                Listbox(
-                                                    default_values=["w1"],
-                                                    values=self.wl_keys,
-                                                    size=(12, 4),
-                                                    key="select wl",
-                                                    enable_events=True,
-                                                ),
-                                            ],
-                                            [Text("", size=(5, 2))],
-                                            [
-                                                Text(
-                                                    "Select field",
-                                                    size=(12, 2),
-                                                ),
-                                                Listbox(
-                                                    default_values=["f1"],
-                                                    values=self.field_keys,
-                                                    size=(12, 4),
-                                                    key="select field",
-                                                    enable_events=True,
-                                                ),
-                                            ],
-                                        )
-                                    )
+                                    [
+                                        Text(
+                                            "Select wavelength",
+                                            size=(12, 2),
+                                        ),
+                                        Listbox(
+                                            default_values=["w1"],
+                                            values=self.wl_keys,
+                                            size=(12, 4),
+                                            key="select wl",
+                                            enable_events=True,
+                                        ),
+                                        self.spacer(5, 2),
+                                        Text(
+                                            "Select field",
+                                            size=(12, 2),
+                                        ),
+                                        Listbox(
+                                            default_values=["f1"],
+                                            values=self.field_keys,
+                                            size=(12, 4),
+                                            key="select field",
+                                            enable_events=True,
+                                        ),
+                                    ]
                                 ],
                                 font=self.font_titles,
                                 relief=RELIEF_SUNKEN,
                                 key="INPUTS FRAME",
                             )
                         ],
-                        [Text("", size=(6, 1))],
-                        list(
-                            itertools.chain(
-                                [
-                                    Frame(
-                                        "Run and Save",
-                                        layout=[
-                                            [Text("Run a diagnostic raytrace")],
-                                            [
-                                                Button(
-                                                    tooltip="Launch raytrace",
-                                                    button_text="Raytrace",
-                                                    enable_events=True,
-                                                    key="-RAYTRACE-",
-                                                )
-                                            ],
-                                            [
-                                                Column(
-                                                    layout=[
-                                                        [
-                                                            Multiline(
-                                                                key="raytrace log",
-                                                                font=self.font_small,
-                                                                autoscroll=True,
-                                                                size=(90, 20),
-                                                                pad=(
-                                                                    0,
-                                                                    (15, 0),
-                                                                ),
-                                                                disabled=False,
-                                                            )
-                                                        ]
-                                                    ],
-                                                    key="raytrace log col",
-                                                )
-                                            ],
-                                            [
-                                                Button(
-                                                    tooltip="Save raytrace output",
-                                                    button_text="Save raytrace",
-                                                    enable_events=True,
-                                                    key="-SAVE RAYTRACE-",
-                                                )
-                                            ],
-                                            [Text("", size=(6, 1))],
-                                            [
-                                                Text(
-                                                    "Run the POP: ",
-                                                    size=(30, 1),
-                                                ),
-                                                Button(
-                                                    tooltip="Launch POP",
-                                                    button_text="POP",
-                                                    enable_events=True,
-                                                    key="-POP-",
-                                                ),
-                                                ProgressBar(
-                                                    max_value=10,
-                                                    orientation="horizontal",
-                                                    size=(20, 8),
-                                                    border_width=2,
-                                                    key="progbar",
-                                                    metadata=0,
-                                                    bar_color=(
-                                                        "Yellow",
-                                                        "Gray",
-                                                    ),
-                                                ),
-                                            ],
-                                            [
-                                                Text(
-                                                    "Save the POP output: ",
-                                                    size=(30, 1),
-                                                ),
-                                                Button(
-                                                    tooltip="Save the POP output",
-                                                    button_text="Save POP",
-                                                    enable_events=True,
-                                                    key="-SAVE POP-",
-                                                ),
-                                            ],
-                                            [Text("", size=(6, 1))],
-                                            [
-                                                Text(
-                                                    "Select surface zoom: ",
-                                                    size=(30, 1),
-                                                ),
-                                                InputText(
-                                                    tooltip="Surface zoom",
-                                                    default_text="1",
-                                                    key="Surface zoom",
-                                                    enable_events=True,
-                                                ),
-                                            ],
-                                            [
-                                                Text(
-                                                    "Select surface number: ",
-                                                    size=(30, 1),
-                                                ),
-                                                InputCombo(
-                                                    tooltip="Surface number",
-                                                    values=self.ld_keys,
-                                                    default_value=f"S{self.nrows_ld}",
-                                                    key="S#",
-                                                    enable_events=True,
-                                                ),
-                                            ],
-                                            [
-                                                Text(
-                                                    "Select plot scale: ",
-                                                    size=(30, 1),
-                                                ),
-                                                InputCombo(
-                                                    tooltip="Color scale",
-                                                    values=[
-                                                        "linear scale",
-                                                        "log scale",
-                                                    ],
-                                                    default_value="log scale",
-                                                    key="Ima scale",
-                                                    enable_events=True,
-                                                ),
-                                            ],
-                                            [
-                                                Text(
-                                                    "Plot surface: ",
-                                                    size=(30, 1),
-                                                ),
-                                                Button(
-                                                    tooltip="Plot",
-                                                    button_text="Plot",
-                                                    enable_events=True,
-                                                    key="-PLOT-",
-                                                ),
-                                                Text(
-                                                    " " + self.symbol_state,
-                                                    font=("Tahoma", 20),
-                                                    text_color="red",
-                                                    key="PLOT-STATE",
-                                                ),
+                        [self.spacer(6, 1)],
+                        [
+                            Frame(
+                                "Run and Save",
+                                layout=[
+                                    [Text("Run a diagnostic raytrace")],
+                                    [
+                                        Button(
+                                            tooltip="Launch raytrace",
+                                            button_text="Raytrace",
+                                            enable_events=True,
+                                            key="-RAYTRACE-",
+                                        )
+                                    ],
+                                    [
+                                        Column(
+                                            layout=[
+                                                [
+                                                    Multiline(
+                                                        key="raytrace log",
+                                                        font=self.font_small,
+                                                        autoscroll=True,
+                                                        size=(90, 20),
+                                                        pad=(
+                                                            0,
+                                                            (15, 0),
+                                                        ),
+                                                        disabled=False,
+                                                    )
+                                                ]
                                             ],
-                                            [
-                                                Text(
-                                                    "Save the Plots",
-                                                    size=(30, 1),
-                                                ),
-                                                Button(
-                                                    tooltip="Save the plot",
-                                                    button_text="Save Plot",
-                                                    enable_events=True,
-                                                    key="-SAVE FIG-",
-                                                ),
+                                            key="raytrace log col",
+                                        )
+                                    ],
+                                    [
+                                        Button(
+                                            tooltip="Save raytrace output",
+                                            button_text="Save raytrace",
+                                            enable_events=True,
+                                            key="-SAVE RAYTRACE-",
+                                        )
+                                    ],
+                                    [self.spacer(6, 1)],
+                                    [
+                                        Text(
+                                            "Run the POP: ",
+                                            size=(30, 1),
+                                        ),
+                                        Button(
+                                            tooltip="Launch POP",
+                                            button_text="POP",
+                                            enable_events=True,
+                                            key="-POP-",
+                                        ),
+                                        ProgressBar(
+                                            max_value=10,
+                                            orientation="horizontal",
+                                            size=(20, 8),
+                                            border_width=2,
+                                            key="progbar",
+                                            metadata=0,
+                                            bar_color=(
+                                                "Yellow",
+                                                "Gray",
+                                            ),
+                                        ),
+                                    ],
+                                    [
+                                        Text(
+                                            "Save the POP output: ",
+                                            size=(30, 1),
+                                        ),
+                                        Button(
+                                            tooltip="Save the POP output",
+                                            button_text="Save POP",
+                                            enable_events=True,
+                                            key="-SAVE POP-",
+                                        ),
+                                    ],
+                                    [self.spacer(6, 1)],
+                                    [
+                                        Text(
+                                            "Select surface zoom: ",
+                                            size=(30, 1),
+                                        ),
+                                        InputText(
+                                            tooltip="Surface zoom",
+                                            default_text="1",
+                                            key="Surface zoom",
+                                            enable_events=True,
+                                        ),
+                                    ],
+                                    [
+                                        Text(
+                                            "Select surface number: ",
+                                            size=(30, 1),
+                                        ),
+                                        InputCombo(
+                                            tooltip="Surface number",
+                                            values=self.ld_keys,
+                                            default_value=f"S{self.nrows_ld}",
+                                            key="S#",
+                                            enable_events=True,
+                                        ),
+                                    ],
+                                    [
+                                        Text(
+                                            "Select plot scale: ",
+                                            size=(30, 1),
+                                        ),
+                                        InputCombo(
+                                            tooltip="Color scale",
+                                            values=[
+                                                "linear scale",
+                                                "log scale",
                                             ],
-                                        ],
-                                        font=self.font_subtitles,
-                                        relief=RELIEF_SUNKEN,
-                                        expand_x=True,
-                                        expand_y=True,
-                                        key="-RUN AND SAVE FRAME-",
-                                    )
+                                            default_value="log scale",
+                                            key="Ima scale",
+                                            enable_events=True,
+                                        ),
+                                    ],
+                                    [
+                                        Text(
+                                            "Plot surface: ",
+                                            size=(30, 1),
+                                        ),
+                                        Button(
+                                            tooltip="Plot",
+                                            button_text="Plot",
+                                            enable_events=True,
+                                            key="-PLOT-",
+                                        ),
+                                        Text(
+                                            " " + self.symbol_state,
+                                            font=("Tahoma", 20),
+                                            text_color="red",
+                                            key="PLOT-STATE",
+                                        ),
+                                    ],
+                                    [
+                                        Text(
+                                            "Save the Plots",
+                                            size=(30, 1),
+                                        ),
+                                        Button(
+                                            tooltip="Save the plot",
+                                            button_text="Save Plot",
+                                            enable_events=True,
+                                            key="-SAVE FIG-",
+                                        ),
+                                    ],
                                 ],
-                                [
-                                    Frame(
-                                        "Display",
-                                        layout=[
-                                            [Text("", size=(6, 1))],
-                                            [
-                                                Button(
-                                                    tooltip="Display plot",
-                                                    button_text="Display plot",
-                                                    enable_events=True,
-                                                    key="-DISPLAY PLOT-",
-                                                )
-                                            ],
-                                            [Image(key="-IMAGE-")],
-                                        ],
-                                        font=self.font_subtitles,
-                                        relief=RELIEF_SUNKEN,
-                                        expand_x=True,
-                                        expand_y=True,
-                                        key="IMAGE FRAME",
-                                    )
+                                font=self.font_subtitles,
+                                relief=RELIEF_SUNKEN,
+                                expand_x=True,
+                                expand_y=True,
+                                key="-RUN AND SAVE FRAME-",
+                            ),
+                            Frame(
+                                "Display",
+                                layout=[
+                                    [self.spacer(6, 1)],
+                                    [
+                                        Button(
+                                            tooltip="Display plot",
+                                            button_text="Display plot",
+                                            enable_events=True,
+                                            key="-DISPLAY PLOT-",
+                                        )
+                                    ],
+                                    [Image(key="-IMAGE-")],
                                 ],
-                            )
-                        ),
+                                font=self.font_subtitles,
+                                relief=RELIEF_SUNKEN,
+                                expand_x=True,
+                                expand_y=True,
+                                key="IMAGE FRAME",
+                            ),
+                        ],
                     ],
                     scrollable=True,
                     expand_x=True,
@@ -1622,7 +1919,7 @@ class PaosGui(SimpleGui):
             [
                 Column(
                     layout=[
-                        [Text("", size=(6, 1))],
+                        [self.spacer(6, 1)],
                         [
                             Button(
                                 self.triangle_right,
@@ -1679,269 +1976,233 @@ class PaosGui(SimpleGui):
                                                         key="INPUTS FRAME (nwl)",
                                                     )
                                                 ],
-                                                list(
-                                                    itertools.chain(
-                                                        [
-                                                            Frame(
-                                                                "Run and Save",
-                                                                layout=[
-                                                                    [
-                                                                        Text(
-                                                                            "",
-                                                                            size=(
-                                                                                6,
-                                                                                2,
-                                                                            ),
-                                                                        )
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Number of parallel jobs: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        InputText(
-                                                                            tooltip="Number of jobs",
-                                                                            default_text=2,
-                                                                            key="NJOBS (nwl)",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Run the multi-wl POP: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        Button(
-                                                                            tooltip="Launch POP",
-                                                                            button_text="POP",
-                                                                            enable_events=True,
-                                                                            key="-POP (nwl)-",
-                                                                        ),
-                                                                        ProgressBar(
-                                                                            max_value=10,
-                                                                            orientation="horizontal",
-                                                                            size=(
-                                                                                20,
-                                                                                8,
-                                                                            ),
-                                                                            border_width=2,
-                                                                            key="progbar (nwl)",
-                                                                            metadata=0,
-                                                                            bar_color=(
-                                                                                "Yellow",
-                                                                                "Gray",
-                                                                            ),
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Save the POP output: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        Button(
-                                                                            tooltip="Save the POP output",
-                                                                            button_text="Save POP",
-                                                                            enable_events=True,
-                                                                            key="-SAVE POP (nwl)-",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "",
-                                                                            size=(
-                                                                                6,
-                                                                                2,
-                                                                            ),
-                                                                        )
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Range to plot: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        InputText(
-                                                                            tooltip="Select sim range to plot",
-                                                                            default_text="0-1",
-                                                                            key="RANGE (nwl)",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Select surface zoom: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        InputText(
-                                                                            tooltip="Surface zoom",
-                                                                            default_text="1",
-                                                                            key="Surface zoom (nwl)",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Select surface number: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        InputCombo(
-                                                                            tooltip="Surface number",
-                                                                            values=self.ld_keys,
-                                                                            default_value=f"S{self.nrows_ld}",
-                                                                            key="S# (nwl)",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Select plot scale: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        InputCombo(
-                                                                            tooltip="Color scale",
-                                                                            values=[
-                                                                                "linear scale",
-                                                                                "log scale",
-                                                                            ],
-                                                                            default_value="log scale",
-                                                                            key="Ima scale (nwl)",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Plot surface: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        Button(
-                                                                            tooltip="Plot",
-                                                                            button_text="Plot",
-                                                                            enable_events=True,
-                                                                            key="-PLOT (nwl)-",
-                                                                        ),
-                                                                        Text(
-                                                                            " "
-                                                                            + self.symbol_state,
-                                                                            font=(
-                                                                                "Tahoma",
-                                                                                20,
-                                                                            ),
-                                                                            text_color="red",
-                                                                            key="PLOT-STATE (nwl)",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Figure prefix: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        InputText(
-                                                                            tooltip="Figure prefix",
-                                                                            default_text="Plot",
-                                                                            key="Fig prefix (nwl)",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Save the Plots",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        Button(
-                                                                            tooltip="Save the plots",
-                                                                            button_text="Save Plot",
-                                                                            enable_events=True,
-                                                                            key="-SAVE FIG (nwl)-",
-                                                                        ),
+                                                [
+                                                    Frame(
+                                                        "Run and Save",
+                                                        layout=[
+                                                            [self.spacer(6, 2)],
+                                                            [
+                                                                Text(
+                                                                    "Number of parallel jobs: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                InputText(
+                                                                    tooltip="Number of jobs",
+                                                                    default_text=2,
+                                                                    key="NJOBS (nwl)",
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Run the multi-wl POP: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                Button(
+                                                                    tooltip="Launch POP",
+                                                                    button_text="POP",
+                                                                    enable_events=True,
+                                                                    key="-POP (nwl)-",
+                                                                ),
+                                                                ProgressBar(
+                                                                    max_value=10,
+                                                                    orientation="horizontal",
+                                                                    size=(
+                                                                        20,
+                                                                        8,
+                                                                    ),
+                                                                    border_width=2,
+                                                                    key="progbar (nwl)",
+                                                                    metadata=0,
+                                                                    bar_color=(
+                                                                        "Yellow",
+                                                                        "Gray",
+                                                                    ),
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Save the POP output: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                Button(
+                                                                    tooltip="Save the POP output",
+                                                                    button_text="Save POP",
+                                                                    enable_events=True,
+                                                                    key="-SAVE POP (nwl)-",
+                                                                ),
+                                                            ],
+                                                            [self.spacer(6, 2)],
+                                                            [
+                                                                Text(
+                                                                    "Range to plot: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                InputText(
+                                                                    tooltip="Select sim range to plot",
+                                                                    default_text="0-1",
+                                                                    key="RANGE (nwl)",
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Select surface zoom: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                InputText(
+                                                                    tooltip="Surface zoom",
+                                                                    default_text="1",
+                                                                    key="Surface zoom (nwl)",
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Select surface number: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                InputCombo(
+                                                                    tooltip="Surface number",
+                                                                    values=self.ld_keys,
+                                                                    default_value=f"S{self.nrows_ld}",
+                                                                    key="S# (nwl)",
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Select plot scale: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                InputCombo(
+                                                                    tooltip="Color scale",
+                                                                    values=[
+                                                                        "linear scale",
+                                                                        "log scale",
                                                                     ],
-                                                                ],
-                                                                font=self.font_subtitles,
-                                                                relief=RELIEF_SUNKEN,
-                                                                expand_x=True,
-                                                                expand_y=True,
-                                                                key="-RUN AND SAVE FRAME (nwl)-",
-                                                            )
+                                                                    default_value="log scale",
+                                                                    key="Ima scale (nwl)",
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Plot surface: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                Button(
+                                                                    tooltip="Plot",
+                                                                    button_text="Plot",
+                                                                    enable_events=True,
+                                                                    key="-PLOT (nwl)-",
+                                                                ),
+                                                                Text(
+                                                                    " "
+                                                                    + self.symbol_state,
+                                                                    font=(
+                                                                        "Tahoma",
+                                                                        20,
+                                                                    ),
+                                                                    text_color="red",
+                                                                    key="PLOT-STATE (nwl)",
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Figure prefix: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                InputText(
+                                                                    tooltip="Figure prefix",
+                                                                    default_text="Plot",
+                                                                    key="Fig prefix (nwl)",
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Save the Plots",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                Button(
+                                                                    tooltip="Save the plots",
+                                                                    button_text="Save Plot",
+                                                                    enable_events=True,
+                                                                    key="-SAVE FIG (nwl)-",
+                                                                ),
+                                                            ],
                                                         ],
-                                                        [
-                                                            Frame(
-                                                                "Display",
-                                                                layout=[
-                                                                    [
-                                                                        Text(
-                                                                            "",
-                                                                            size=(
-                                                                                6,
-                                                                                1,
-                                                                            ),
-                                                                        )
-                                                                    ],
-                                                                    [
-                                                                        Button(
-                                                                            tooltip="Display plot",
-                                                                            button_text="Display plot",
-                                                                            enable_events=True,
-                                                                            key="-DISPLAY PLOT (nwl)-",
-                                                                        ),
-                                                                        Text(
-                                                                            "",
-                                                                            size=(
-                                                                                2,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        Slider(
-                                                                            range=(
-                                                                                0,
-                                                                                10,
-                                                                            ),
-                                                                            orientation="horizontal",
-                                                                            size=(
-                                                                                40,
-                                                                                15,
-                                                                            ),
-                                                                            default_value=0,
-                                                                            key="-Slider (nwl)-",
-                                                                            enable_events=True,
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Image(
-                                                                            key="-IMAGE (nwl)-"
-                                                                        )
-                                                                    ],
-                                                                ],
-                                                                font=self.font_subtitles,
-                                                                relief=RELIEF_SUNKEN,
-                                                                expand_x=True,
-                                                                expand_y=True,
-                                                                key="IMAGE FRAME (nwl)",
-                                                            )
+                                                        font=self.font_subtitles,
+                                                        relief=RELIEF_SUNKEN,
+                                                        expand_x=True,
+                                                        expand_y=True,
+                                                        key="-RUN AND SAVE FRAME (nwl)-",
+                                                    ),
+                                                    Frame(
+                                                        "Display",
+                                                        layout=[
+                                                            [self.spacer(6, 1)],
+                                                            [
+                                                                Button(
+                                                                    tooltip="Display plot",
+                                                                    button_text="Display plot",
+                                                                    enable_events=True,
+                                                                    key="-DISPLAY PLOT (nwl)-",
+                                                                ),
+                                                                self.spacer(2, 1),
+                                                                Slider(
+                                                                    range=(
+                                                                        0,
+                                                                        10,
+                                                                    ),
+                                                                    orientation="horizontal",
+                                                                    size=(
+                                                                        40,
+                                                                        15,
+                                                                    ),
+                                                                    default_value=0,
+                                                                    key="-Slider (nwl)-",
+                                                                    enable_events=True,
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Image(
+                                                                    key="-IMAGE (nwl)-"
+                                                                )
+                                                            ],
                                                         ],
-                                                    )
-                                                ),
+                                                        font=self.font_subtitles,
+                                                        relief=RELIEF_SUNKEN,
+                                                        expand_x=True,
+                                                        expand_y=True,
+                                                        key="IMAGE FRAME (nwl)",
+                                                    ),
+                                                ],
                                             ],
                                             key="FRAME MC (nwl)",
                                         )
@@ -1949,7 +2210,7 @@ class PaosGui(SimpleGui):
                                 ]
                             )
                         ],
-                        [Text("", size=(6, 2))],
+                        [self.spacer(6, 2)],
                         [
                             Button(
                                 self.triangle_right,
@@ -1979,388 +2240,345 @@ class PaosGui(SimpleGui):
                                                     Frame(
                                                         "Select inputs",
                                                         layout=[
-                                                            list(
-                                                                itertools.chain(
-                                                                    [
-                                                                        Text(
-                                                                            "Select wavelength",
-                                                                            size=(
-                                                                                12,
-                                                                                2,
-                                                                            ),
-                                                                        ),
-                                                                        Listbox(
-                                                                            default_values=[
-                                                                                "w1"
-                                                                            ],
-                                                                            values=self.wl_keys,
-                                                                            size=(
-                                                                                12,
-                                                                                4,
-                                                                            ),
-                                                                            key="select wl (wfe)",
-                                                                            enable_events=True,
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "",
-                                                                            size=(
-                                                                                5,
-                                                                                2,
-                                                                            ),
-                                                                        )
+                                                            [
+                                                                Text(
+                                                                    "Select wavelength",
+                                                                    size=(
+                                                                        12,
+                                                                        2,
+                                                                    ),
+                                                                ),
+                                                                Listbox(
+                                                                    default_values=[
+                                                                        "w1"
                                                                     ],
-                                                                    [
-                                                                        Text(
-                                                                            "Select field",
-                                                                            size=(
-                                                                                12,
-                                                                                2,
-                                                                            ),
-                                                                        ),
-                                                                        Listbox(
-                                                                            default_values=[
-                                                                                "f1"
-                                                                            ],
-                                                                            values=self.field_keys,
-                                                                            size=(
-                                                                                12,
-                                                                                4,
-                                                                            ),
-                                                                            key="select field (wfe)",
-                                                                            enable_events=True,
-                                                                        ),
+                                                                    values=self.wl_keys,
+                                                                    size=(
+                                                                        12,
+                                                                        4,
+                                                                    ),
+                                                                    key="select wl (wfe)",
+                                                                    enable_events=True,
+                                                                ),
+                                                                self.spacer(5, 2),
+                                                                Text(
+                                                                    "Select field",
+                                                                    size=(
+                                                                        12,
+                                                                        2,
+                                                                    ),
+                                                                ),
+                                                                Listbox(
+                                                                    default_values=[
+                                                                        "f1"
                                                                     ],
-                                                                )
-                                                            )
+                                                                    values=self.field_keys,
+                                                                    size=(
+                                                                        12,
+                                                                        4,
+                                                                    ),
+                                                                    key="select field (wfe)",
+                                                                    enable_events=True,
+                                                                ),
+                                                            ]
                                                         ],
                                                         key="INPUTS FRAME (wfe)",
                                                         font=self.font_subtitles,
                                                         relief=RELIEF_SUNKEN,
                                                     )
                                                 ],
-                                                list(
-                                                    itertools.chain(
-                                                        [
-                                                            Frame(
-                                                                "Run and Save",
-                                                                layout=[
-                                                                    [
-                                                                        Text(
-                                                                            "",
-                                                                            size=(
-                                                                                6,
-                                                                                2,
-                                                                            ),
-                                                                        )
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Import Wavefront error table: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        Button(
-                                                                            tooltip="Import wfe table",
-                                                                            button_text="Import wfe",
-                                                                            enable_events=True,
-                                                                            key="-IMPORT WFE-",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Unit of Zernike coefficients: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        InputCombo(
-                                                                            tooltip="Zernike unit",
-                                                                            values=[
-                                                                                "meters",
-                                                                                "millimeters",
-                                                                                "micrometers",
-                                                                                "nanometers",
-                                                                            ],
-                                                                            default_value="nanometers",
-                                                                            key="ZUNIT (wfe)",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "",
-                                                                            size=(
-                                                                                6,
-                                                                                2,
-                                                                            ),
-                                                                        )
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Number of parallel jobs: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        InputText(
-                                                                            tooltip="Number of jobs",
-                                                                            default_text=2,
-                                                                            key="NJOBS (wfe)",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Index of Zernike surface: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        InputText(
-                                                                            tooltip="Index of Zernike",
-                                                                            default_text="",
-                                                                            key="NSURF (wfe)",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Run the POP for each wfe: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        Button(
-                                                                            tooltip="Launch POP",
-                                                                            button_text="POP",
-                                                                            enable_events=True,
-                                                                            key="-POP (wfe)-",
-                                                                        ),
-                                                                        ProgressBar(
-                                                                            max_value=10,
-                                                                            orientation="horizontal",
-                                                                            size=(
-                                                                                20,
-                                                                                8,
-                                                                            ),
-                                                                            border_width=2,
-                                                                            key="progbar (wfe)",
-                                                                            metadata=0,
-                                                                            bar_color=(
-                                                                                "Yellow",
-                                                                                "Gray",
-                                                                            ),
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Save the POP output: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        Button(
-                                                                            tooltip="Save the POP output",
-                                                                            button_text="Save POP",
-                                                                            enable_events=True,
-                                                                            key="-SAVE POP (wfe)-",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "",
-                                                                            size=(
-                                                                                6,
-                                                                                2,
-                                                                            ),
-                                                                        )
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Range to plot: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        InputText(
-                                                                            tooltip="Select sim range to plot",
-                                                                            default_text="0-1",
-                                                                            key="RANGE (wfe)",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Select surface zoom: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        InputText(
-                                                                            tooltip="Surface zoom",
-                                                                            default_text="1",
-                                                                            key="Surface zoom (wfe)",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Select surface number: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        InputCombo(
-                                                                            tooltip="Surface number",
-                                                                            values=self.ld_keys,
-                                                                            default_value=f"S{self.nrows_ld}",
-                                                                            key="S# (wfe)",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Select plot scale: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        InputCombo(
-                                                                            tooltip="Color scale",
-                                                                            values=[
-                                                                                "linear scale",
-                                                                                "log scale",
-                                                                            ],
-                                                                            default_value="log scale",
-                                                                            key="Ima scale (wfe)",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Plot surface: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        Button(
-                                                                            tooltip="Plot",
-                                                                            button_text="Plot",
-                                                                            enable_events=True,
-                                                                            key="-PLOT (wfe)-",
-                                                                        ),
-                                                                        Text(
-                                                                            " "
-                                                                            + self.symbol_state,
-                                                                            font=(
-                                                                                "Tahoma",
-                                                                                20,
-                                                                            ),
-                                                                            text_color="red",
-                                                                            key="PLOT-STATE (wfe)",
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Text(
-                                                                            "Figure prefix: ",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        InputText(
-                                                                            tooltip="Figure prefix",
-                                                                            default_text="Plot",
-                                                                            key="Fig prefix (wfe)",
-                                                                        ),
+                                                [
+                                                    Frame(
+                                                        "Run and Save",
+                                                        layout=[
+                                                            [self.spacer(6, 2)],
+                                                            [
+                                                                Text(
+                                                                    "Import Wavefront error table: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                Button(
+                                                                    tooltip="Import wfe table",
+                                                                    button_text="Import wfe",
+                                                                    enable_events=True,
+                                                                    key="-IMPORT WFE-",
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Unit of Zernike coefficients: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                InputCombo(
+                                                                    tooltip="Zernike unit",
+                                                                    values=[
+                                                                        "meters",
+                                                                        "millimeters",
+                                                                        "micrometers",
+                                                                        "nanometers",
                                                                     ],
-                                                                    [
-                                                                        Text(
-                                                                            "Save the Plots",
-                                                                            size=(
-                                                                                30,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        Button(
-                                                                            tooltip="Save the plots",
-                                                                            button_text="Save Plot",
-                                                                            enable_events=True,
-                                                                            key="-SAVE FIG (wfe)-",
-                                                                        ),
+                                                                    default_value="nanometers",
+                                                                    key="ZUNIT (wfe)",
+                                                                ),
+                                                            ],
+                                                            [self.spacer(6, 2)],
+                                                            [
+                                                                Text(
+                                                                    "Number of parallel jobs: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                InputText(
+                                                                    tooltip="Number of jobs",
+                                                                    default_text=2,
+                                                                    key="NJOBS (wfe)",
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Single precision: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                Checkbox(
+                                                                    text="FP32 (wfe)",
+                                                                    tooltip="Propagate the wavefront as complex64 (faster, less accurate)",
+                                                                    default=False,
+                                                                    key="FP32 (wfe)",
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Index of Zernike surface: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                InputText(
+                                                                    tooltip="Index of Zernike",
+                                                                    default_text="",
+                                                                    key="NSURF (wfe)",
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Run the POP for each wfe: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                Button(
+                                                                    tooltip="Launch POP",
+                                                                    button_text="POP",
+                                                                    enable_events=True,
+                                                                    key="-POP (wfe)-",
+                                                                ),
+                                                                ProgressBar(
+                                                                    max_value=10,
+                                                                    orientation="horizontal",
+                                                                    size=(
+                                                                        20,
+                                                                        8,
+                                                                    ),
+                                                                    border_width=2,
+                                                                    key="progbar (wfe)",
+                                                                    metadata=0,
+                                                                    bar_color=(
+                                                                        "Yellow",
+                                                                        "Gray",
+                                                                    ),
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Save the POP output: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                Button(
+                                                                    tooltip="Save the POP output",
+                                                                    button_text="Save POP",
+                                                                    enable_events=True,
+                                                                    key="-SAVE POP (wfe)-",
+                                                                ),
+                                                            ],
+                                                            [self.spacer(6, 2)],
+                                                            [
+                                                                Text(
+                                                                    "Range to plot: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                InputText(
+                                                                    tooltip="Select sim range to plot",
+                                                                    default_text="0-1",
+                                                                    key="RANGE (wfe)",
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Select surface zoom: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                InputText(
+                                                                    tooltip="Surface zoom",
+                                                                    default_text="1",
+                                                                    key="Surface zoom (wfe)",
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Select surface number: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                InputCombo(
+                                                                    tooltip="Surface number",
+                                                                    values=self.ld_keys,
+                                                                    default_value=f"S{self.nrows_ld}",
+                                                                    key="S# (wfe)",
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Select plot scale: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                InputCombo(
+                                                                    tooltip="Color scale",
+                                                                    values=[
+                                                                        "linear scale",
+                                                                        "log scale",
                                                                     ],
-                                                                ],
-                                                                font=self.font_subtitles,
-                                                                relief=RELIEF_SUNKEN,
-                                                                expand_x=True,
-                                                                expand_y=True,
-                                                                key="-RUN AND SAVE FRAME (wfe)-",
-                                                            )
+                                                                    default_value="log scale",
+                                                                    key="Ima scale (wfe)",
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Plot surface: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                Button(
+                                                                    tooltip="Plot",
+                                                                    button_text="Plot",
+                                                                    enable_events=True,
+                                                                    key="-PLOT (wfe)-",
+                                                                ),
+                                                                Text(
+                                                                    " "
+                                                                    + self.symbol_state,
+                                                                    font=(
+                                                                        "Tahoma",
+                                                                        20,
+                                                                    ),
+                                                                    text_color="red",
+                                                                    key="PLOT-STATE (wfe)",
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Figure prefix: ",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                InputText(
+                                                                    tooltip="Figure prefix",
+                                                                    default_text="Plot",
+                                                                    key="Fig prefix (wfe)",
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Text(
+                                                                    "Save the Plots",
+                                                                    size=(
+                                                                        30,
+                                                                        1,
+                                                                    ),
+                                                                ),
+                                                                Button(
+                                                                    tooltip="Save the plots",
+                                                                    button_text="Save Plot",
+                                                                    enable_events=True,
+                                                                    key="-SAVE FIG (wfe)-",
+                                                                ),
+                                                            ],
                                                         ],
-                                                        [
-                                                            Frame(
-                                                                "Display",
-                                                                layout=[
-                                                                    [
-                                                                        Text(
-                                                                            "",
-                                                                            size=(
-                                                                                6,
-                                                                                1,
-                                                                            ),
-                                                                        )
-                                                                    ],
-                                                                    [
-                                                                        Button(
-                                                                            tooltip="Display plot",
-                                                                            button_text="Display plot",
-                                                                            enable_events=True,
-                                                                            key="-DISPLAY PLOT (wfe)-",
-                                                                        ),
-                                                                        Text(
-                                                                            "",
-                                                                            size=(
-                                                                                2,
-                                                                                1,
-                                                                            ),
-                                                                        ),
-                                                                        Slider(
-                                                                            range=(
-                                                                                0,
-                                                                                10,
-                                                                            ),
-                                                                            orientation="horizontal",
-                                                                            size=(
-                                                                                40,
-                                                                                15,
-                                                                            ),
-                                                                            default_value=0,
-                                                                            key="-Slider (wfe)-",
-                                                                            enable_events=True,
-                                                                        ),
-                                                                    ],
-                                                                    [
-                                                                        Image(
-                                                                            key="-IMAGE (wfe)-"
-                                                                        )
-                                                                    ],
-                                                                ],
-                                                                font=self.font_subtitles,
-                                                                relief=RELIEF_SUNKEN,
-                                                                expand_x=True,
-                                                                expand_y=True,
-                                                                key="-IMAGE FRAME (wfe)-",
-                                                            )
+                                                        font=self.font_subtitles,
+                                                        relief=RELIEF_SUNKEN,
+                                                        expand_x=True,
+                                                        expand_y=True,
+                                                        key="-RUN AND SAVE FRAME (wfe)-",
+                                                    ),
+                                                    Frame(
+                                                        "Display",
+                                                        layout=[
+                                                            [self.spacer(6, 1)],
+                                                            [
+                                                                Button(
+                                                                    tooltip="Display plot",
+                                                                    button_text="Display plot",
+                                                                    enable_events=True,
+                                                                    key="-DISPLAY PLOT (wfe)-",
+                                                                ),
+                                                                self.spacer(2, 1),
+                                                                Slider(
+                                                                    range=(
+                                                                        0,
+                                                                        10,
+                                                                    ),
+                                                                    orientation="horizontal",
+                                                                    size=(
+                                                                        40,
+                                                                        15,
+                                                                    ),
+                                                                    default_value=0,
+                                                                    key="-Slider (wfe)-",
+                                                                    enable_events=True,
+                                                                ),
+                                                            ],
+                                                            [
+                                                                Image(
+                                                                    key="-IMAGE (wfe)-"
+                                                                )
+                                                            ],
                                                         ],
-                                                    )
-                                                ),
+                                                        font=self.font_subtitles,
+                                                        relief=RELIEF_SUNKEN,
+                                                        expand_x=True,
+                                                        expand_y=True,
+                                                        key="-IMAGE FRAME (wfe)-",
+                                                    ),
+                                                ],
                                             ],
                                             key="FRAME MC (wfe)",
                                         )
@@ -2494,6 +2712,7 @@ class PaosGui(SimpleGui):
         )
 
         self.window["-CONF TAB GROUP-"].expand(True, True, True)
+        self.shown_par_headings = None
 
         # ------ Cursors definition ------ #
         self.window["-ADD SURFACE-"].set_cursor(cursor="hand1")
@@ -2504,10 +2723,10 @@ class PaosGui(SimpleGui):
         self.window["-GUI VERSION-"].set_cursor(cursor="clock")
 
         # ------- Bind method for Par headings ------#
-        for r, (c, head) in itertools.product(
-            range(1, self.nrows_ld + 1), enumerate(self.lens_data.keys())
-        ):
-            self.window[f"{head}_({r},{c})"].bind("<Button-1>", "_LeftClick")
+        # A single binding for the whole application, rather than one per lens data editor cell
+        self.cell_widgets.clear()
+        self.index_lens_cells(range(1, self.nrows_ld + 1))
+        self.window.TKroot.bind_all("<Button-1>", self.on_left_click)
 
         return
 
@@ -2532,28 +2751,65 @@ class PaosGui(SimpleGui):
         selected_row = None
 
         pop = ""
+        # Events that need the output of a given POP mode, and the name of the POP to run first
+        pop_events = {
+            "-SAVE POP-": ("simple", "POP"),
+            "-SAVE POP (nwl)-": ("nwl", "POP (nwl)"),
+            "-SAVE POP (wfe)-": ("wfe", "POP (wfe)"),
+            "-PLOT-": ("simple", "POP"),
+            "-PLOT (nwl)-": ("nwl", "POP (nwl)"),
+            "-PLOT (wfe)-": ("wfe", "POP (wfe)"),
+        }
+
+        close_events = (
+            WINDOW_CLOSED,
+            WINDOW_CLOSE_ATTEMPTED_EVENT,
+            "Exit",
+            "-EXIT-",
+        )
+        # Lens data editor rows whose surface type changed, not applied yet (ordered, without duplicates)
+        pending_surface_types = {}
 
         while True:  # Event Loop
             # ------- Read the current window ------#
-            self.event, self.values = self.window.read(timeout=1000)
+            # While surface type changes are pending, wait only briefly for further events
+            self.event, self.values = self.window.read(
+                timeout=_SURFACE_TYPE_DEBOUNCE if pending_surface_types else 1000
+            )
+
+            # ------- Assign/edit the surface type in the lens data editor ------#
+            # Consecutive changes (e.g. scrolling through the Combo) are merged and applied once per row,
+            # as soon as the GUI is idle or another event comes
+            if isinstance(self.event, str) and self.event.startswith("SurfaceType"):
+                row, col = self.get_cell(self.event)
+                pending_surface_types[row] = None
+                continue
+            if pending_surface_types and self.event not in close_events:
+                for row in pending_surface_types:
+                    self.apply_surface_type(row)
+                pending_surface_types.clear()
+                # Enable/Disable the wfe frame
+                self.update_wfe_frame()
+
             if self.event == TIMEOUT_KEY:
                 continue
             logger.trace(f"============ Event = {self.event} ==============")
 
-            # ------- Save to temporary configuration file ------#
-            self.to_ini(temporary=True)
-
-            # ------- Find the window element with focus ------#
-            elem = self.window.find_element_with_focus()
+            # ------- Find the window element with focus, only for the events that need it ------#
+            arrow_event = isinstance(self.event, str) and self.event.startswith(
+                ARROW_EVENTS
+            )
             elem_key = (
-                elem.Key
-                if (elem is not None and isinstance(elem.Key, (str, tuple)))
+                self.get_focus_key()
+                if arrow_event or self.event == "-PASTE WL-"
                 else (0, 0)
             )
 
             # ------- Move with arrow keys within the editor tab and update the headings accordingly ------#
-            if isinstance(elem_key, str) and elem_key.startswith(
-                tuple([head for head in self.lens_data.keys()])
+            if (
+                arrow_event
+                and isinstance(elem_key, str)
+                and elem_key.startswith(self.ld_headings)
             ):
                 # Move with arrow keys
                 row = self.move_with_arrow_keys(
@@ -2562,18 +2818,13 @@ class PaosGui(SimpleGui):
                     self.values,
                     elem_key,
                     self.nrows_ld,
-                    len(self.lens_data.keys()),
+                    len(self.ld_headings),
                 )
                 # Update headings
                 self.update_headings(row)
 
             # ------- Save (optional) and properly close the current window ------#
-            if self.event in (
-                WINDOW_CLOSED,
-                WINDOW_CLOSE_ATTEMPTED_EVENT,
-                "Exit",
-                "-EXIT-",
-            ):
+            if self.event in close_events:
                 # Clear simulation outputs
                 self.reset_simulation()
                 # Close the current window
@@ -2581,9 +2832,9 @@ class PaosGui(SimpleGui):
                 break
 
             # ------- Update the headings according to mouse left click ------#
-            elif isinstance(elem_key, str) and self.event == elem_key + "_LeftClick":
-                cell = re.findall("[0-9]+", elem_key.partition("_")[-1])
-                row, col = tuple(map(int, cell))
+            elif self.event == "-LD CELL CLICK-":
+                # The clicked cell key comes with the event: no need to query the focus
+                row, col = self.get_cell(self.values[self.event])
                 self.update_headings(row)
                 selected_row = self.highlight_row(row, selected_row)
 
@@ -2595,22 +2846,23 @@ class PaosGui(SimpleGui):
             # ------- Paste from the clipboard to the desired wavelength input cells ------#
             elif self.event == "-PASTE WL-":
                 # Check if focus is on a wavelength input cell
-                if not elem_key.startswith("w"):
+                if not (isinstance(elem_key, str) and elem_key.startswith("w")):
                     logger.warning("Wavelength cell not selected. Skipping..")
                     continue
                 # Get text from the clipboard
                 text = self.get_clipboard_text()
-                row0 = row = int(elem_key[1:])
-                # Loop through text to insert the wavelengths one at a time
-                for text_item in text:
+                row0 = int(elem_key[1:])
+                # Add all the missing wavelength rows at once and update wavelength count
+                count = row0 + len(text) - 1 - self.nrows_wl
+                if count > 0:
+                    self.nrows_wl = self.add_row("wavelengths", count=count)
+                    self.wl_keys.extend(
+                        f"w{k}"
+                        for k in range(self.nrows_wl - count + 1, self.nrows_wl + 1)
+                    )
+                # Insert the wavelengths
+                for row, text_item in enumerate(text, start=row0):
                     self.window[f"w{row}"].update(text_item)
-                    if self.nrows_wl <= row < row0 + len(text) - 1:
-                        # Add the new wavelength and update wavelength count
-                        self.nrows_wl = self.add_row("wavelengths")
-                        self.wl_keys.append(f"w{self.nrows_wl}")
-                        # Update 'select wl' Listbox widget in the launcher Tab
-                        self.window["select wl"].update(self.wl_keys, set_to_index=0)
-                    row += 1
                 # Update the 'wavelengths' Column scrollbar
                 self.update_column_scrollbar(window=self.window, col_key="wavelengths")
                 # Update 'select wl' Listbox widget in the launcher Tab
@@ -2670,8 +2922,10 @@ class PaosGui(SimpleGui):
                 "-OPEN TAB APERTURE-"
             ):
                 # Find current location in the lens data editor
-                row, col = re.findall("[0-9]+", self.event)
+                row, col = self.get_cell(self.event)
                 aperture_tab_key = f"LD_Tab_({row},{col})"
+                # Build the aperture tab widgets, the first time it is opened
+                self.build_aperture_tab(row, col)
                 # Make the aperture tab visible/invisible
                 aperture_tab_visible = self.make_visible(
                     self.event, aperture_tab_visible, aperture_tab_key
@@ -2679,63 +2933,6 @@ class PaosGui(SimpleGui):
                 # Update the 'Lens data' Column scrollbar
                 self.update_column_scrollbar(window=self.window, col_key="lenses")
 
-            # ------- Assign/edit the surface type in the lens data editor ------#
-            elif isinstance(self.event, str) and self.event.startswith("SurfaceType"):
-                # Get the current row
-                row, col = re.findall("[0-9]+", self.event)
-                surface_type_key = f"SurfaceType_({row},0)"
-                # Loop through all widgets in the current row
-                for c, (key, value) in enumerate(self.lens_data.items()):
-                    name_key = f"{key}_({row},{c})"
-                    # Apply the pre-defined rules for the lens data editor to enable/disable a widget
-                    item = self.lens_data_rules(
-                        surface_type=self.values[surface_type_key],
-                        header=name_key,
-                    )
-                    disabled = True if item == "NaN" else False
-                    if key == "aperture":
-                        item_column_key = f"-OPEN TAB APERTURE-({row},{c})"
-                        # Update triangle symbol
-                        self.window[item_column_key].update(
-                            self.symbol_disabled if disabled else self.triangle_right
-                        )
-                        title_column_key = f"LD_Tab_Title_({row},8)"
-                        text_color = "gray" if disabled else "yellow"
-                        # Update aperture text color
-                        self.window[title_column_key].update(text_color=text_color)
-                    else:
-                        item_column_key = f"{key}_({row},{c})"
-                    # Enable/disable the row widgets
-                    self.window[item_column_key].update(disabled=disabled)
-
-                # Only if the selected surface type is Zernike...
-                if self.values[surface_type_key] == "Zernike":
-                    # Display popup to select action
-                    action = popup_ok_cancel(
-                        "Insert/Edit Zernike coefficients", keep_on_top=True
-                    )
-                    if action == "OK":
-                        key = "lens_{:02d}".format(int(row))
-                        # Launch the Zernike GUI editor
-                        zernike = ZernikeGui(
-                            config=self.config,
-                            values=self.values,
-                            row=row,
-                            key=key,
-                        )()
-                        if key in self.config.keys():
-                            # Update the zernike values in the config object
-                            self.config[key].update(zernike)
-                        else:
-                            # Create ex-novo the zernike values in the config object
-                            for subkey, subitem in zernike.items():
-                                self.config.set(key, subkey, subitem)
-                        # Update the zernike ordering (relevant only if previously not indicated)
-                        col = list(self.lens_data.keys()).index("Par2")
-                        self.window[f"Par2_({row},{col})"].update(zernike["ordering"])
-                # Enable/Disable the wfe frame
-                self.update_wfe_frame()
-
             # ------- Enable/Disable the wfe frame ------#
             elif isinstance(self.event, str) and self.event.startswith("Ignore"):
                 self.update_wfe_frame()
@@ -2772,7 +2969,6 @@ class PaosGui(SimpleGui):
                     self.window["raytrace log"].update(raytrace_log)
                 # Reset progress bar
                 _ = self.reset_progress_bar(self.window["progbar"])
-                _ = gc.collect()
 
             # ------- Update 'Select field' Listbox widget in MC Wavelengths frame ------#
             elif self.event == "select field (nwl)":
@@ -2786,7 +2982,6 @@ class PaosGui(SimpleGui):
                 self.clear_image(self.window["-IMAGE (nwl)-"])
                 # Reset progress bar
                 _ = self.reset_progress_bar(self.window["progbar (nwl)"])
-                _ = gc.collect()
 
             # ------- Update 'Select wavelength' or 'Select field' Listbox widget in MC Wavefront error frame ------#
             elif self.event in ["select wl (wfe)", "select field (wfe)"]:
@@ -2800,7 +2995,6 @@ class PaosGui(SimpleGui):
                 self.clear_image(self.window["-IMAGE (wfe)-"])
                 # Reset progress bar
                 _ = self.reset_progress_bar(self.window["progbar (wfe)"])
-                _ = gc.collect()
 
             # ------- Make the 'MC Wavelengths' frame visible/invisible by clicking on the triangle symbol ------#
             elif self.event == "-OPEN FRAME MC (nwl)-":
@@ -2836,26 +3030,35 @@ class PaosGui(SimpleGui):
                     wavelengths,
                     fields,
                     opt_chains,
-                ) = parse_config(self.temporary_config)
+                ) = self.parse_temporary_config()
                 wavelength, field, opt_chain = (
                     wavelengths[n_wl],
                     fields[n_field],
                     opt_chains[n_wl],
                 )
-                # Run the raytrace
-                raytrace_log = raytrace(field, opt_chain)
-                # Update the raytrace log Column
-                self.window["raytrace log"].update("\n".join(raytrace_log))
+                # Run the raytrace in a separate thread, to keep the GUI responsive
+                self.window["-RAYTRACE-"].update(disabled=True)
+                self.run_in_thread(
+                    partial(raytrace, field, opt_chain), "-RAYTRACE DONE-"
+                )
                 # For later saving
                 self.saving_groups = [wavelength]
 
+            # ------- Display the output of the diagnostic raytrace ------#
+            elif self.event == "-RAYTRACE DONE-":
+                self.window["-RAYTRACE-"].update(disabled=False)
+                if self.values[self.event] is None:
+                    continue
+                raytrace_log = self.values[self.event]
+                # Update the raytrace log Column
+                self.window["raytrace log"].update("\n".join(raytrace_log))
+
             # ------- Run the POP ------#
             elif self.event == "-POP-":
                 if self.values[self.values["select wl"][0]] == "":
                     logger.error(f"Invalid wavelength. Continuing..")
                     continue
                 self.reset_simulation()
-                progbar = self.window["progbar"]
                 # Get the wavelength and the field indexes from the respective Listbox widgets
                 (n_wl,) = self.window["select wl"].GetIndexes()
                 (n_field,) = self.window["select field"].GetIndexes()
@@ -2866,23 +3069,39 @@ class PaosGui(SimpleGui):
                     wavelengths,
                     fields,
                     opt_chains,
-                ) = parse_config(self.temporary_config)
+                ) = self.parse_temporary_config()
                 wavelength, field, opt_chain = (
                     wavelengths[n_wl],
                     fields[n_field],
                     opt_chains[n_wl],
                 )
-                # Run the POP
-                self.retval = run(
-                    pup_diameter,
-                    1.0e-6 * wavelength,
-                    parameters["grid_size"],
-                    parameters["zoom"],
-                    field,
-                    opt_chain,
+                # Run the POP in a separate thread, to keep the GUI responsive. No other POP can be
+                # launched meanwhile, since this output would then replace that of the later run
+                for key in _POP_LAUNCH_KEYS:
+                    self.window[key].update(disabled=True)
+                self.run_in_thread(
+                    partial(
+                        run,
+                        pup_diameter,
+                        1.0e-6 * wavelength,
+                        parameters["grid_size"],
+                        parameters["zoom"],
+                        field,
+                        opt_chain,
+                    ),
+                    "-POP DONE-",
                 )
                 # For later saving
                 self.saving_groups = [wavelength]
+
+            # ------- Collect the output of the POP ------#
+            elif self.event == "-POP DONE-":
+                for key in _POP_LAUNCH_KEYS:
+                    self.window[key].update(disabled=False)
+                if self.values[self.event] is None:
+                    continue
+                progbar = self.window["progbar"]
+                self.retval = self.values[self.event]
                 self.retval_list = [self.retval]
                 # For later plotting
                 pop = "simple"
@@ -2897,8 +3116,6 @@ class PaosGui(SimpleGui):
                 progbar_nwl = self.window["progbar (nwl)"]
                 # Get the field index from the Listbox widget
                 (n_field,) = self.window["select field (nwl)"].GetIndexes()
-                # Get the number of parallel jobs
-                n_jobs = int(self.values["NJOBS (nwl)"])
                 # Parse the temporary configuration file
                 (
                     pup_diameter,
@@ -2906,33 +3123,53 @@ class PaosGui(SimpleGui):
                     wavelengths,
                     fields,
                     opt_chains,
-                ) = parse_config(self.temporary_config)
+                ) = self.parse_temporary_config()
                 field = fields[n_field]
+                # Get the number of parallel jobs: do not start more worker processes than wavelengths
+                n_jobs = (
+                    min(
+                        effective_n_jobs(int(self.values["NJOBS (nwl)"])),
+                        len(wavelengths),
+                    )
+                    or 1
+                )
+                grid_size, zoom = parameters["grid_size"], parameters["zoom"]
                 # Run the POP
                 start_time = time.time()
                 logger.info("Start POP in parallel...")
-                for i in range(0, len(wavelengths), n_jobs):
-                    wl_batch = wavelengths[i : i + n_jobs]
-                    opt_batch = opt_chains[i : i + n_jobs]
-                    self.retval_list.append(
-                        Parallel(n_jobs=n_jobs)(
+                # Dispatch all the runs to a single worker pool and collect them as they complete.
+                # The batch size adapts to the measured task duration, with at most 2*n_jobs tasks in flight.
+                # Each batch is pickled as a whole, so the optical chain shared by its tasks is sent once,
+                # and large arrays are memory-mapped read-only in the workers
+                with Parallel(
+                    n_jobs=n_jobs,
+                    backend="loky",
+                    mmap_mode="r",
+                    batch_size="auto",
+                    pre_dispatch="2*n_jobs",
+                    return_as="generator",
+                ) as parallel:
+                    for retval in tqdm(
+                        parallel(
                             delayed(run)(
                                 pup_diameter,
                                 1.0e-6 * wavelength,
-                                parameters["grid_size"],
-                                parameters["zoom"],
+                                grid_size,
+                                zoom,
                                 field,
                                 opt_chain,
                             )
-                            for wavelength, opt_chain in tqdm(zip(wl_batch, opt_batch))
+                            for wavelength, opt_chain in zip(wavelengths, opt_chains)
+                        ),
+                        total=len(wavelengths),
+                    ):
+                        self.retval_list.append(retval)
+                        # Update progress bar
+                        self.update_progress_bar(
+                            progbar_nwl,
+                            progbar_nwl.Size[0] / len(wavelengths),
+                            final=len(self.retval_list) == len(wavelengths),
                         )
-                    )
-                    # Update progress bar
-                    progress = np.ceil(
-                        progbar_nwl.Size[0] * len(wl_batch) / len(wavelengths)
-                    )
-                    progbar_nwl.metadata += progress
-                    progbar_nwl.update_bar(progbar_nwl.metadata)
                 logger.info(
                     "Parallel POP completed in {:6.1f}s".format(
                         time.time() - start_time
@@ -2940,7 +3177,6 @@ class PaosGui(SimpleGui):
                 )
                 # For later saving
                 self.saving_groups = wavelengths
-                self.retval_list = list(itertools.chain.from_iterable(self.retval_list))
                 # For later plotting
                 self.window["RANGE (nwl)"].update(
                     value="-".join(["0", str(len(self.retval_list))])
@@ -2997,8 +3233,10 @@ class PaosGui(SimpleGui):
                 # Get the wavelength and the field indexes from the respective Listbox widgets
                 (n_wl,) = self.window["select wl (wfe)"].GetIndexes()
                 (n_field,) = self.window["select field (wfe)"].GetIndexes()
-                # Get the number of parallel jobs
-                n_jobs = int(self.values["NJOBS (wfe)"])
+                # Get the number of parallel jobs: do not start more worker processes than realizations
+                n_jobs = (
+                    min(effective_n_jobs(int(self.values["NJOBS (wfe)"])), sims) or 1
+                )
                 # Parse the temporary configuration file
                 (
                     pup_diameter,
@@ -3006,40 +3244,59 @@ class PaosGui(SimpleGui):
                     wavelengths,
                     fields,
                     opt_chains,
-                ) = parse_config(self.temporary_config)
+                ) = self.parse_temporary_config()
                 wavelength, field, opt_chain = (
                     wavelengths[n_wl],
                     fields[n_field],
                     opt_chains[n_wl],
                 )
-                opt = []
-                for k in range(sims):
-                    temp = copy.deepcopy(opt_chain)
-                    ck = wfe["col%i" % (k + 4)].data * wave
-                    temp[int(surf)]["Z"] = np.append(np.zeros(3), ck)
-                    opt.append(temp)
+                # Get the Zernike coefficients of each wfe realization, one per row
+                ck = np.stack([wfe["col%i" % (k + 4)].data for k in range(sims)]) * wave
+                zernikes = np.hstack((np.zeros((sims, 3)), ck))
+                # The arguments shared by all runs are computed once
+                wl = 1.0e-6 * wavelength
+                grid_size, zoom = parameters["grid_size"], parameters["zoom"]
+                # Optionally propagate in single precision
+                dtype = np.complex64 if self.values["FP32 (wfe)"] else np.complex128
                 # Run the POP
                 start_time = time.time()
                 logger.info("Start POP in parallel...")
-                for i in range(0, sims, n_jobs):
-                    opt_batch = opt[i : i + n_jobs]
-                    self.retval_list.append(
-                        Parallel(n_jobs=n_jobs)(
-                            delayed(run)(
+                # Dispatch all the runs to a single worker pool and collect them as they complete.
+                # The batch size adapts to the measured task duration, with at most 2*n_jobs tasks in flight.
+                # Each batch is pickled as a whole, so the optical chain shared by its tasks is sent once,
+                # and large arrays are memory-mapped read-only in the workers
+                with Parallel(
+                    n_jobs=n_jobs,
+                    backend="loky",
+                    mmap_mode="r",
+                    batch_size="auto",
+                    pre_dispatch="2*n_jobs",
+                    return_as="generator",
+                ) as parallel:
+                    for retval in tqdm(
+                        parallel(
+                            delayed(run_wfe)(
                                 pup_diameter,
-                                1.0e-6 * wavelength,
-                                parameters["grid_size"],
-                                parameters["zoom"],
+                                wl,
+                                grid_size,
+                                zoom,
                                 field,
-                                o_chain,
+                                opt_chain,
+                                int(surf),
+                                ck,
+                                dtype,
                             )
-                            for o_chain in tqdm(opt_batch)
+                            for ck in zernikes
+                        ),
+                        total=sims,
+                    ):
+                        self.retval_list.append(retval)
+                        # Update progress bar
+                        self.update_progress_bar(
+                            progbar_wfe,
+                            progbar_wfe.Size[0] / sims,
+                            final=len(self.retval_list) == sims,
                         )
-                    )
-                    # Update progress bar
-                    progress = np.ceil(progbar_wfe.Size[0] * len(opt_batch) / len(opt))
-                    progbar_wfe.metadata += progress
-                    progbar_wfe.update_bar(progbar_wfe.metadata)
                 logger.info(
                     "Parallel POP completed in {:6.1f}s".format(
                         time.time() - start_time
@@ -3047,7 +3304,6 @@ class PaosGui(SimpleGui):
                 )
                 # For later saving
                 self.saving_groups = list(range(sims))
-                self.retval_list = list(itertools.chain.from_iterable(self.retval_list))
                 # For later plotting
                 self.window["RANGE (wfe)"].update(
                     value="-".join(["0", str(len(self.retval_list))])
@@ -3060,34 +3316,26 @@ class PaosGui(SimpleGui):
                 # Save the raytrace output
                 self.to_txt(text_list=raytrace_log)
 
-            # ------- Save the output of the POP ------#
-            elif self.event == "-SAVE POP-":
-                if pop != "simple" or not self.retval_list:
-                    logger.error("Run POP first")
-                    continue
-                # Save the POP output
-                self.to_hdf5(self.retval_list, self.saving_groups)
-
-            # ------- Save the output of the POP (nwl) ------#
-            elif self.event == "-SAVE POP (nwl)-":
-                if pop != "nwl" or not self.retval_list:
-                    logger.error("Run POP (nwl) first")
-                    continue
-                # Save the POP output
-                self.to_hdf5(self.retval_list, self.saving_groups)
+            # ------- Check that the POP output to save or plot is available ------#
+            elif self.event in pop_events and (
+                pop != pop_events[self.event][0] or not self.retval_list
+            ):
+                logger.error(f"Run {pop_events[self.event][1]} first")
+                continue
 
-            # ------- Save the output of the POP (wfe) ------#
-            elif self.event == "-SAVE POP (wfe)-":
-                if pop != "wfe" or not self.retval_list:
-                    logger.error("Run POP (wfe) first")
-                    continue
+            # ------- Save the output of the POP (simple, nwl or wfe) ------#
+            elif self.event in ("-SAVE POP-", "-SAVE POP (nwl)-", "-SAVE POP (wfe)-"):
                 # Save the POP output
                 self.to_hdf5(self.retval_list, self.saving_groups)
 
             # ------- Plot at the given optical surface ------#
             elif self.event == "-PLOT-":
-                if pop != "simple" or not self.retval_list:
-                    logger.error("Run POP first")
+                # The current figure is up to date: keep it (and its rendering) instead of plotting it again
+                if self.figure is not None and (
+                    self.values["Surface zoom"],
+                    self.values["S#"],
+                    self.values["Ima scale"],
+                ) == (self.surface_zoom, self.surface_number, self.surface_scale):
                     continue
                 self.figure = self.draw_surface(
                     retval_list=self.retval_list,
@@ -3108,9 +3356,6 @@ class PaosGui(SimpleGui):
                 self.surface_scale = self.values["Ima scale"]
 
             elif self.event == "-PLOT (nwl)-":
-                if pop != "nwl" or not self.retval_list:
-                    logger.error("Run POP (nwl) first")
-                    continue
                 self.figure_list_nwl, idx_nwl = self.draw_surface(
                     retval_list=self.retval_list,
                     groups=self.saving_groups,
@@ -3126,9 +3371,6 @@ class PaosGui(SimpleGui):
                     self.window["PLOT-STATE (nwl)"].update(text_color="green")
 
             elif self.event == "-PLOT (wfe)-":
-                if pop != "wfe" or not self.retval_list:
-                    logger.error("Run POP (wfe) first")
-                    continue
                 self.figure_list_wfe, idx_wfe = self.draw_surface(
                     retval_list=self.retval_list,
                     groups=self.saving_groups,
@@ -3194,17 +3436,25 @@ class PaosGui(SimpleGui):
                 if folder is None:
                     logger.warning("Pressed Cancel. Continuing...")
                     continue
-                for wl, figure in zip(
-                    np.array(self.saving_groups)[idx_nwl],
-                    np.array(self.figure_list_nwl),
-                ):
-                    filename = os.path.join(
-                        folder,
-                        f'{self.values["Fig prefix (nwl)"]}_{self.values["S# (nwl)"]}_'
-                        f'{self.values["select field (nwl)"][0]}_wl{wl}micron.png',
+                # Build the file names, looking up the GUI values once
+                prefix = "_".join(
+                    [
+                        self.values["Fig prefix (nwl)"],
+                        str(self.values["S# (nwl)"]),
+                        str(self.values["select field (nwl)"][0]),
+                    ]
+                )
+                filenames = [
+                    os.path.join(
+                        folder, f"{prefix}_wl{self.saving_groups[i]}micron.png"
                     )
-                    # Save the plot to the specified .png or .jpg file
-                    self.save_figure(figure, filename)
+                    for i in idx_nwl
+                ]
+                # Save the plots to the specified .png files (threads avoid pickling the figures)
+                Parallel(n_jobs=-1, backend="threading")(
+                    delayed(self.save_figure)(figure, filename)
+                    for figure, filename in zip(self.figure_list_nwl, filenames)
+                )
 
             # ------- Save the Plot (wfe) ------#
             elif self.event == "-SAVE FIG (wfe)-":
@@ -3216,17 +3466,23 @@ class PaosGui(SimpleGui):
                 if folder is None:
                     logger.warning("Pressed Cancel. Continuing...")
                     continue
-                for n, figure in zip(
-                    np.array(self.saving_groups)[idx_wfe],
-                    np.array(self.figure_list_wfe),
-                ):
-                    filename = os.path.join(
-                        folder,
-                        f'{self.values["Fig prefix (wfe)"]}_{self.values["S# (wfe)"]}_'
-                        f'{self.values["select field (wfe)"][0]}_N{n}.png',
-                    )
-                    # Save the plot to the specified .png or .jpg file
-                    self.save_figure(figure, filename)
+                # Build the file names, looking up the GUI values once
+                prefix = "_".join(
+                    [
+                        self.values["Fig prefix (wfe)"],
+                        str(self.values["S# (wfe)"]),
+                        str(self.values["select field (wfe)"][0]),
+                    ]
+                )
+                filenames = [
+                    os.path.join(folder, f"{prefix}_N{self.saving_groups[i]}.png")
+                    for i in idx_wfe
+                ]
+                # Save the plots to the specified .png files (threads avoid pickling the figures)
+                Parallel(n_jobs=-1, backend="threading")(
+                    delayed(self.save_figure)(figure, filename)
+                    for figure, filename in zip(self.figure_list_wfe, filenames)
+                )
 
             # # ------- Display a popup window with the GUI values given as a flat dictionary ------#
             # elif self.event == "-SUBMIT-":
@@ -1,16 +1,15 @@
 import configparser
-import gc
 import io
-import itertools
 import os
-import re
 import sys
-from tkinter import Tk
+import time
+import weakref
+from functools import lru_cache
+from tkinter import TclError
 from typing import List
 
 from matplotlib import pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasAgg
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from PySimpleGUI import Canvas
 from PySimpleGUI import Checkbox
 from PySimpleGUI import clipboard_set
@@ -29,12 +28,45 @@ from paos import save_datacube
 from paos.core.plot import plot_psf_xsec
 from paos.core.plot import simple_plot
 
+# PNG renderings of the displayed figures, dropped together with the figures
+_png_cache = weakref.WeakKeyDictionary()
+
+# String conversion of the supported non-string configuration values, by type
+_CONFIG_VALUE_CONVERTERS = {
+    str: str,
+    float: str,
+    bool: str,
+    tuple: ",".join,
+    list: ",".join,
+}
+
+# Keyboard events that move the focus within a table editor (e.g. 'Up:38' or 'Up:111', depending on the platform)
+ARROW_EVENTS = ("Up", "Down", "Left", "Right")
+
 
 class SimpleGui:
     """
     Base class for the Graphical User Interface (GUI) for ``PAOS``, built using the publicly available library PySimpleGUI
     """
 
+    __slots__ = (
+        "window",
+        "config",
+        "temporary_config",
+        "last_progress_update",
+        "cell_keys",
+        "font_titles",
+        "font_subtitles",
+        "font_small",
+        "font_underlined",
+        "menu_def",
+        "right_click_menu_def",
+        "symbol_disabled",
+        "symbol_state",
+        "triangle_down",
+        "triangle_right",
+    )
+
     def __init__(self):
         """
         Initializes the GUI.
@@ -46,6 +78,8 @@ class SimpleGui:
         self.window = None
         self.config = None
         self.temporary_config = None
+        self.last_progress_update = 0.0
+        self.cell_keys = {}
         self.font_titles = ("Helvetica", 20)
         self.font_subtitles = ("Helvetica", 18)
         self.font_small = ("Courier New", 10)
@@ -99,10 +133,28 @@ class SimpleGui:
             a chained list of Text widgets
 
         """
-        headings_list = []
-        for i, head in enumerate(headings):
-            headings_list.append(Text(head, key=head, size=size))
-        return list(itertools.chain([Text(" " * 8)], headings_list))
+        return [Text(" " * 8)] + [Text(head, key=head, size=size) for head in headings]
+
+    @staticmethod
+    def spacer(width, height):
+        """
+        Given a width and a height in characters, returns a blank Text element to be used as a layout spacer.
+        The element is sized in characters of the window font, so that the spacer scales with the font
+
+        Parameters
+        ----------
+        width: int
+            the spacer width, in characters
+        height: int
+            the spacer height, in characters
+
+        Returns
+        -------
+        out: Text
+            a blank Text element with size (width, height)
+
+        """
+        return Text("", size=(width, height))
 
     @staticmethod
     def collapse_frame(title, layout, key):
@@ -169,7 +221,26 @@ class SimpleGui:
         return
 
     @staticmethod
-    def get_clipboard_text():
+    @lru_cache(maxsize=None)
+    def get_cell(key):
+        """
+        Given the key of a table editor cell (e.g. 'Radius_(2,3)'), returns the cell row and column.
+        The key format is fixed, so it is parsed with plain string operations, once per key
+
+        Parameters
+        ----------
+        key: str
+            the table editor cell key, ending with '(row,col)'
+
+        Returns
+        -------
+        out: tuple(int, int)
+            the cell row and column
+        """
+        row, col = key[key.rindex("(") + 1 : -1].split(",")
+        return int(row), int(col)
+
+    def get_clipboard_text(self):
         """
         Returns a copy of the local clipboard content (e.g. an Excel column)
 
@@ -178,14 +249,19 @@ class SimpleGui:
         out: List[str]
             the local copy of the clipboard's content
         """
-        root = Tk()
-        root.withdraw()
-        text = root.clipboard_get().replace("\n", ",").split(",")
+        # Read the clipboard from the Tk root of the current window: unlike PySimpleGUI's clipboard_get, this
+        # neither goes through a separate hidden root nor forces a Tk update
+        try:
+            text = self.window.TKroot.clipboard_get()
+        except TclError:
+            # Empty clipboard
+            return []
+        text = text.replace("\n", ",").split(",")
         text = text if text[-1] != "" else text[:-1]
         return text
 
     @staticmethod
-    def to_configparser(dictionary):
+    def to_configparser(dictionary, config=None):
         """
         Given a dictionary, it converts it into a :class:`~configparser.ConfigParser` object
 
@@ -193,27 +269,40 @@ class SimpleGui:
         ----------
         dictionary: dict
             input dictionary to be converted
+        config: :class:`~configparser.ConfigParser` or None
+            if given, this parser is emptied and filled in place instead of creating a new one
 
         Returns
         -------
         out: :class:`~configparser.ConfigParser`
         """
 
-        config = configparser.ConfigParser()
+        if config is None:
+            config = configparser.ConfigParser()
+        else:
+            for section in config.sections():
+                config.remove_section(section)
 
         for key, item in dictionary.items():
             if isinstance(item, dict):
                 config.add_section(key)
                 for subkey, subitem in item.items():
-                    if subitem is not None and subitem != "":
-                        if isinstance(subitem, str):
-                            pass
-                        elif isinstance(subitem, (float, bool)):
-                            subitem = str(subitem)
-                        elif isinstance(subitem, (tuple, list)):
-                            subitem = ",".join(subitem)
-                        else:
+                    # The GUI values are almost all strings: test for them first
+                    if type(subitem) is not str and subitem is not None:
+                        convert = _CONFIG_VALUE_CONVERTERS.get(type(subitem))
+                        if convert is None:
+                            # Subclasses of the supported types (e.g. numpy.float64)
+                            convert = next(
+                                (
+                                    converter
+                                    for kind, converter in _CONFIG_VALUE_CONVERTERS.items()
+                                    if isinstance(subitem, kind)
+                                ),
+                                None,
+                            )
+                        if convert is None:
                             raise NotImplementedError("item type not supported")
+                        subitem = convert(subitem)
                     config.set(key, subkey, subitem)
 
         return config
@@ -263,7 +352,7 @@ class SimpleGui:
             logger.debug("Saving file format not provided. Defaulting to .h5")
             filename = "".join([filename, ".h5"])
 
-        # Save the POP output to the specified .hdf5 file
+        # Save the POP output to the specified .hdf5 file, one compressed chunk per 2D array
         tags = list(map(str, groups))
         save_datacube(
             retval_list,
@@ -271,6 +360,7 @@ class SimpleGui:
             tags,
             keys_to_keep=keys_to_keep,
             overwrite=True,
+            compression="gzip",
         )
         return
 
@@ -332,6 +422,8 @@ class SimpleGui:
         out: FigureCanvasTkAgg
             the Tkinter widget to draw a :class:`~matplotlib.figure.Figure` onto a Canvas
         """
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
         figure_canvas_agg = FigureCanvasTkAgg(figure, canvas)
         figure_canvas_agg.draw()
         figure_canvas_agg.get_tk_widget().pack(side="top", fill="both", expand=1)
@@ -340,7 +432,9 @@ class SimpleGui:
     @staticmethod
     def draw_image(figure, element):
         """
-        Draws the previously created "figure" in the supplied Image Element
+        Draws the previously created "figure" in the supplied Image Element.
+        The figure is rendered once: since the plotted figures are not modified after creation,
+        displaying it again (e.g. when moving the slider back and forth) reuses its PNG rendering
 
         Parameters
         ----------
@@ -360,13 +454,18 @@ class SimpleGui:
             logger.error("Plot first")
             return
 
-        plt.close("all")  # erases previously drawn plots
+        if figure in _png_cache:
+            element.update(data=_png_cache[figure])
+            element.update(visible=True)
+            return figure.canvas
+
         canvas = FigureCanvasAgg(figure)
         buf = io.BytesIO()
         canvas.print_figure(buf, format="png")
         if buf is not None:
             buf.seek(0)
-            element.update(data=buf.read())
+            _png_cache[figure] = buf.read()
+            element.update(data=_png_cache[figure])
             element.update(visible=True)
             return canvas
         else:
@@ -457,8 +556,81 @@ class SimpleGui:
         progress_bar.update_bar(progress_bar.metadata)
         return progress_bar
 
-    @staticmethod
-    def move_with_arrow_keys(window, event, values, elem_key, max_rows, max_cols):
+    def update_progress_bar(self, progress_bar, step, final=False, interval=0.1):
+        """
+        Given a progress bar element, it advances it by the given step. Since window updates are expensive,
+        the bar is redrawn at most once every interval seconds, and always on the final step
+
+        Parameters
+        ----------
+        progress_bar: ProgressBar
+            the progress bar element to update
+        step: scalar
+            the progress bar increment
+        final: bool
+            if True, the progress bar is redrawn regardless of the time since the last update
+        interval: scalar
+            the minimum time in seconds between two redraws
+
+        Returns
+        -------
+        out: ProgressBar
+            updates the progress bar element
+        """
+        progress_bar.metadata += step
+        now = time.monotonic()
+        if final or now - self.last_progress_update > interval:
+            progress_bar.update_bar(progress_bar.metadata)
+            self.last_progress_update = now
+        return progress_bar
+
+    def run_in_thread(self, func, end_key):
+        """
+        Runs the given function in a separate thread, so that the GUI event loop is not blocked meanwhile.
+        When the function returns, the window receives the end_key event, with the function output as its value
+
+        Parameters
+        ----------
+        func: callable
+            the function to run, without arguments (e.g. a functools.partial)
+        end_key: str
+            the event to generate when the function returns
+
+        Returns
+        -------
+        out: None
+            starts the thread
+        """
+
+        def target():
+            try:
+                return func()
+            except Exception:
+                # Report the failure through the end event, instead of losing it with the thread
+                logger.exception(f"{end_key}: the operation failed")
+                return None
+
+        self.window.perform_long_operation(target, end_key)
+        return
+
+    def get_focus_key(self):
+        """
+        Returns the key of the window element with focus.
+        This queries Tk, so it is best called only for the events that need it
+
+        Returns
+        -------
+        out: str or tuple
+            the key of the element with focus, or (0, 0) if there is none
+        """
+        elem = self.window.find_element_with_focus()
+        return (
+            elem.Key
+            if (elem is not None and isinstance(elem.Key, (str, tuple)))
+            else (0, 0)
+        )
+
+    def move_with_arrow_keys(self, window, event, values, elem_key, max_rows, max_cols):
         """
         Given the current GUI window, the latest event, the dictionary containing the window values, the dictionary key
         for the cell with focus and the maximum sizes for the current table editor, this method sets the focus on
@@ -484,8 +656,8 @@ class SimpleGui:
         out: int
             The row number corresponding to where the current focus is
         """
-        current_cell = re.findall("[0-9]+", elem_key.partition("_")[-1])
-        r, c = tuple(map(int, current_cell))
+        current_cell = self.get_cell(elem_key)
+        r, c = current_cell
 
         if event.startswith("Down"):
             r = r + 1 * (r < max_rows)
@@ -498,23 +670,61 @@ class SimpleGui:
 
         # if the current cell changed, set focus on new cell
         if current_cell != (r, c):
-            for key in values.keys():
-                if key.endswith(f"({r},{c})"):
-                    window[key].set_focus()  # set the focus on the element moved to
-                    window[key].update()
+            key = self.cell_key(r, c, values)
+            if key is not None:
+                window[key].set_focus()  # set the focus on the element moved to
         return r
 
+    def cell_key(self, row, col, values):
+        """
+        Given the row and column of a table editor cell and the dictionary containing the window values,
+        returns the cell key, looked up in an index of the table editor cells
+
+        Parameters
+        ----------
+        row: int
+            the cell row
+        col: int
+            the cell column
+        values: dict
+            the dictionary containing the window values
+
+        Returns
+        -------
+        out: str or None
+            the cell key, or None if there is no such cell
+        """
+        key = self.cell_keys.get((row, col))
+        if key not in values:
+            # (Re)index the table editor cells, e.g. after rows were added or the window was recreated
+            self.cell_keys.clear()
+            for key in values.keys():
+                if isinstance(key, str) and key.endswith(")"):
+                    try:
+                        self.cell_keys[self.get_cell(key)] = key
+                    except ValueError:
+                        continue
+            key = self.cell_keys.get((row, col))
+        return key
+
     @staticmethod
     def copy_to_clipboard(dictionary):
         """
         Saves the relevant data from the GUI configuration tabs into a dictionary, then copies it to the local clipboard
 
+        Parameters
+        ----------
+        dictionary: dict or str
+            the dictionary to copy, or its already serialized text (which is copied as is)
+
         Returns
         -------
         out: None
             copies the data to the local clipboard
         """
-        clipboard_set(str(dictionary))
+        # Serialize once, in a single repr call. Tk is not thread safe, so the clipboard is set from the GUI thread
+        text = dictionary if isinstance(dictionary, str) else repr(dictionary)
+        clipboard_set(text)
         return
 
     @staticmethod
@@ -538,28 +748,21 @@ class SimpleGui:
         out: List[Text, List[Checkbox or Input or Column or Combo]]
             list of widgets
         """
-        if disabled_list is None:
-            disabled_list = []
-        row_widget = [Text(row, size=(6, 1), key=f"row idx {row}")]
-        keys = [f"{prefix}_({row},{i})" for i in range(len(input_list))]
-
         if not disabled_list:
-            disabled_list = [False for _ in input_list]
-
-        return list(
-            itertools.chain(
-                row_widget,
-                [
-                    InputText(
-                        default_text=value,
-                        key=key,
-                        size=(24, 2),
-                        disabled=disabled,
-                    )
-                    for value, key, disabled in zip(input_list, keys, disabled_list)
-                ],
-            )
-        )
+            disabled_list = [False] * len(input_list)
+
+        return [
+            Text(row, size=(6, 1), key=f"row idx {row}"),
+            *(
+                InputText(
+                    default_text=value,
+                    key=f"{prefix}_({row},{i})",
+                    size=(24, 2),
+                    disabled=disabled,
+                )
+                for i, (value, disabled) in enumerate(zip(input_list, disabled_list))
+            ),
+        ]
 
     def make_visible(self, event, visible, key):
         """
@@ -619,9 +822,6 @@ class SimpleGui:
         self.window.close()
         del self.window
 
-        # ------ Collect garbage ------ #
-        _ = gc.collect()
-
         return
 
     @staticmethod
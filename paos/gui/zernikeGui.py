@@ -1,5 +1,3 @@
-import itertools
-import re
 import sys
 
 from PySimpleGUI import Button
@@ -16,6 +14,7 @@ from PySimpleGUI import WINDOW_CLOSED
 
 from paos import logger
 from paos import Zernike
+from paos.gui.simpleGui import ARROW_EVENTS
 from paos.gui.simpleGui import SimpleGui
 
 
@@ -36,6 +35,19 @@ class ZernikeGui(SimpleGui):
 
     """
 
+    __slots__ = (
+        "values",
+        "row",
+        "key",
+        "zernike",
+        "ordering",
+        "max_rows",
+        "headings",
+        "names",
+        "par",
+        "disabled_cols",
+    )
+
     def __init__(self, config, values, row, key):
         super().__init__()
 
@@ -50,11 +62,11 @@ class ZernikeGui(SimpleGui):
         self.ordering = None
         self.par = ["", "", "", "", ""]
         self.names = ["Par1", "Par2", "Par3", "Par4", "Par5"]
-        self.headings = ["Zindex", "Z", "m", "n"]
-        self.disabled_cols = [True, False, True, True]
+        self.headings = ("Zindex", "Z", "m", "n")
+        self.disabled_cols = (True, False, True, True)
         self.max_rows = None
 
-    def add_row(self, row, dictionary, ordering):
+    def add_row(self, row, dictionary, ordering, count=1, z=None):
         """
 
         Parameters
@@ -65,38 +77,49 @@ class ZernikeGui(SimpleGui):
             the dictionary with the Zindex and Z coefficients to update with the new Zernike table row
         ordering: str
             the Zernike coefficients ordering
+        count: int
+            number of rows to add. They are added with a single layout update
+        z: list of str or None
+            the Z coefficients of the new rows (e.g. pasted), so that they are created with their values.
+            If not given, they are set to '0.0'
 
         Returns
         -------
         out: tuple(int, tuple(int, int))
-            Adds a row in the Zernike tab and returns the updated number of rows and the azimuthal number, m,
-            and radial number, n for the Zernike coefficients
+            Adds one or more rows in the Zernike tab and returns the updated number of rows and the azimuthal
+            number, m, and radial number, n for the Zernike coefficients
 
         """
-        row += 1
+        new_rows = range(row + 1, row + count + 1)
+        row += count
 
         # Update the azimuthal and radial number for the Zernike coefficients
         m, n = Zernike.j2mn(N=row, ordering=ordering)
-        dictionary["zindex"].append(str(row))
-        dictionary["z"].append("0.0")
 
-        # Define the input list to fill the new table row with
-        input_list = [str(row - 1), "0.0", m[row - 1], n[row - 1]]
+        if z is None:
+            z = ["0.0"] * count
 
-        # Extend the Column layout
-        self.window.extend_layout(
-            self.window["zernike"],
-            [
+        new_layout = []
+        for r, z_r, m_r, n_r in zip(
+            new_rows, z, m[-count:].tolist(), n[-count:].tolist()
+        ):
+            dictionary["zindex"].append(str(r))
+            dictionary["z"].append(z_r)
+
+            # Define the input list to fill the new table row with
+            input_list = [str(r - 1), z_r, m_r, n_r]
+            new_layout.append(
                 self.chain_widgets(
-                    row=row,
+                    row=r,
                     input_list=input_list,
                     prefix="z",
                     disabled_list=self.disabled_cols,
                 )
-            ],
-        )
-        # Update the GUI Zernike tab
-        self.window["zernike"].update()
+            )
+
+        # Extend the Column layout, all rows at once. The window is refreshed once by the caller,
+        # when updating the Column scrollbar
+        self.window.extend_layout(self.window["zernike"], new_layout)
 
         return row, (m, n)
 
@@ -114,13 +137,9 @@ class ZernikeGui(SimpleGui):
         """
 
         # Get the Zindex and Z coefficients from the parsed configuration file
-        if self.key in self.config.keys() and {"zindex", "z"}.issubset(
-            self.config[self.key].keys()
-        ):
-            zindex, z = (
-                self.config[self.key]["zindex"],
-                self.config[self.key]["z"],
-            )
+        section = self.config[self.key] if self.config.has_section(self.key) else {}
+        if "zindex" in section and "z" in section:
+            zindex, z = section["zindex"], section["z"]
             self.zernike["zindex"] = zindex.split(",") if zindex != "" else ["0"]
             self.zernike["z"] = z.split(",") if z != "" else ["0"]
         else:
@@ -155,6 +174,9 @@ class ZernikeGui(SimpleGui):
 
         # ------ Instantiate the azimuthal and radial Zernike order ------ #
         m, n = Zernike.j2mn(N=self.max_rows, ordering=self.ordering)
+        # Convert them (and the coefficients) to Python scalars at once, rather than row by row
+        m, n = m.tolist(), n.tolist()
+        z = [float(item) for item in self.zernike["z"]]
 
         # ------ Define the Zernike tab layout ------ #
         layout = [
@@ -162,86 +184,65 @@ class ZernikeGui(SimpleGui):
                 Frame(
                     "Parameters",
                     layout=[
-                        list(
-                            itertools.chain(
-                                [
-                                    Text(
-                                        "Wavelength: {}".format(wavelength),
-                                        key="wavelength",
-                                    )
-                                ],
-                                [Text("", size=(6, 1))],
-                                [
-                                    Text(
-                                        "Ordering: {}".format(self.ordering),
-                                        key="ordering",
-                                    )
-                                ],
-                                [Text("", size=(6, 1))],
-                                [
-                                    Text(
-                                        "Normalization: {}".format(normalization),
-                                        key="normalization",
-                                    )
-                                ],
-                                [Text("", size=(6, 1))],
-                                [
-                                    Text(
-                                        "Radius of S.A.: {}".format(radius),
-                                        key="radius",
-                                    )
-                                ],
-                                [Text("", size=(6, 1))],
-                                [
-                                    Text(
-                                        "Origin: {}".format(origin),
-                                        key="origin",
-                                    )
-                                ],
-                            )
-                        )
+                        [
+                            Text(
+                                "Wavelength: {}".format(wavelength),
+                                key="wavelength",
+                            ),
+                            self.spacer(6, 1),
+                            Text(
+                                "Ordering: {}".format(self.ordering),
+                                key="ordering",
+                            ),
+                            self.spacer(6, 1),
+                            Text(
+                                "Normalization: {}".format(normalization),
+                                key="normalization",
+                            ),
+                            self.spacer(6, 1),
+                            Text(
+                                "Radius of S.A.: {}".format(radius),
+                                key="radius",
+                            ),
+                            self.spacer(6, 1),
+                            Text(
+                                "Origin: {}".format(origin),
+                                key="origin",
+                            ),
+                        ]
                     ],
                     font=self.font_titles,
                     relief=RELIEF_SUNKEN,
                     key="-ZERNIKE MEMO FRAME-",
                 )
             ],
-            [Text("", size=(10, 2))],
+            [self.spacer(10, 2)],
             [
                 Frame(
                     "Zernike Setup",
                     layout=[
-                        [Text("", size=(24, 1))],
+                        [self.spacer(24, 1)],
                         [
                             Column(
-                                layout=list(
-                                    itertools.chain(
-                                        [self.add_heading(self.headings)],
-                                        [
-                                            self.chain_widgets(
-                                                row=i + 1,
-                                                input_list=[
-                                                    r,
-                                                    float(self.zernike["z"][i]),
-                                                    int(m[i]),
-                                                    int(n[i]),
-                                                ],
-                                                prefix="z",
-                                                disabled_list=self.disabled_cols,
-                                            )
-                                            for i, r in enumerate(
-                                                self.zernike["zindex"]
-                                            )
-                                        ],
-                                    )
-                                ),
+                                layout=[
+                                    self.add_heading(self.headings),
+                                    *(
+                                        self.chain_widgets(
+                                            row=i + 1,
+                                            input_list=[r, z[i], m[i], n[i]],
+                                            prefix="z",
+                                            disabled_list=self.disabled_cols,
+                                        )
+                                        for i, r in enumerate(self.zernike["zindex"])
+                                    ),
+                                ],
                                 scrollable=True,
                                 vertical_scroll_only=True,
                                 expand_y=True,
                                 key="zernike",
                             )
                         ],
-                        [Text("", size=(10, 2))],
+                        [self.spacer(10, 2)],
                         [
                             Frame(
                                 "Zernike Actions",
@@ -328,15 +329,16 @@ class ZernikeGui(SimpleGui):
             if event == TIMEOUT_KEY:
                 continue
             logger.trace("============ Event = {} ==============".format(event))
-            elem = self.window.find_element_with_focus()
+            # Find the element with focus only for the events that need it
+            arrow_event = isinstance(event, str) and event.startswith(ARROW_EVENTS)
             elem_key = (
-                elem.Key
-                if (elem is not None and isinstance(elem.Key, (str, tuple)))
+                self.get_focus_key()
+                if arrow_event or event == "PASTE ZERNIKES"
                 else (0, 0)
             )
 
             # ------- Move with arrow keys within the Zernike tab ------#
-            if isinstance(elem_key, str):
+            if arrow_event and isinstance(elem_key, str):
                 _ = self.move_with_arrow_keys(
                     self.window,
                     event,
@@ -368,25 +370,27 @@ class ZernikeGui(SimpleGui):
             # ------- Paste from the clipboard to the desired Zernike coefficients 'Z' input cell and below ------#
             elif event == "PASTE ZERNIKES":
                 # Find current position in the Zernike tab
-                row, col = re.findall("[0-9]+", elem_key.partition("_")[-1])
-                if self.headings[int(col)] != "Z":
+                row, col = self.get_cell(elem_key)
+                if self.headings[col] != "Z":
                     logger.error(
                         "The user shall select any cell from from the Z column. Skipping.."
                     )
                     continue
                 # Get the text from the clipboard
                 text = self.get_clipboard_text()
-                # Update the Z coefficients by pasting and adding new rows
-                row0 = row = int(row)
-                for text_item in text:
-                    self.window["z_({},1)".format(row)].update(text_item)
-                    if self.max_rows <= row < row0 + len(text) - 1:
-                        self.max_rows, _ = self.add_row(
-                            row=self.max_rows,
-                            dictionary=self.zernike,
-                            ordering=self.ordering,
-                        )
-                    row += 1
+                # Update the Z coefficients of the existing rows by pasting
+                existing = max(self.max_rows - row + 1, 0)
+                for r, text_item in enumerate(text[:existing], start=row):
+                    self.window[f"z_({r},1)"].update(text_item)
+                # Add all the missing rows at once, created with their pasted Z coefficients
+                if len(text) > existing:
+                    self.max_rows, _ = self.add_row(
+                        row=self.max_rows,
+                        dictionary=self.zernike,
+                        ordering=self.ordering,
+                        count=len(text) - existing,
+                        z=text[existing:],
+                    )
                 # Update the Zernike tab scrollbar
                 self.update_column_scrollbar(window=self.window, col_key="zernike")
 
@@ -400,36 +404,24 @@ class ZernikeGui(SimpleGui):
                         )
                     )
                     continue
-                # Get azimuthal and radial orders and closing order condition
+                # Get azimuthal and radial orders and closing order condition: the radial order
+                # is closed when the last row has the extremal azimuthal number for its order
                 m, n = Zernike.j2mn(N=self.max_rows, ordering=self.ordering)
                 if self.ordering == "standard":
-                    order_closed = min(m) == -max(n)
+                    order_closed = m[-1] == -n[-1]
                 elif self.ordering == "ansi":
-                    order_closed = max(m) == max(n)
-                # Keep adding rows to the current Zernike tab until the current radial order (unclosed) is complete
-                if not order_closed:
-                    while not order_closed:
-                        self.max_rows, (m, n) = self.add_row(
-                            row=self.max_rows,
-                            dictionary=self.zernike,
-                            ordering=self.ordering,
-                        )
-                        if self.ordering == "standard":
-                            order_closed = min(m) == -max(n)
-                        elif self.ordering == "ansi":
-                            order_closed = max(m) == max(n)
-                    # When finished, exit
-                    continue
-                # If the current radial order is closed, keep adding rows to add a new complete radial order
-                new_m = new_n = max(n) + 1
-                if self.ordering == "standard":
-                    new_m = -new_m
+                    order_closed = m[-1] == n[-1]
+                # Complete the current radial order (unclosed) or, if it is closed, add a new complete one
+                new_n = n[-1] if not order_closed else n[-1] + 1
+                new_m = -new_n if self.ordering == "standard" else new_n
                 jmax = Zernike.mn2j(m=new_m, n=new_n, ordering=self.ordering)
-                while self.max_rows < jmax + 1:
+                # Add all the missing rows at once
+                if self.max_rows < jmax + 1:
                     self.max_rows, _ = self.add_row(
                         row=self.max_rows,
                         dictionary=self.zernike,
                         ordering=self.ordering,
+                        count=jmax + 1 - self.max_rows,
                     )
                 # Update the Zernike tab scrollbar
                 self.update_column_scrollbar(window=self.window, col_key="zernike")
@@ -445,17 +437,12 @@ class ZernikeGui(SimpleGui):
                 )
 
         # ------- Return the updated Zernike dictionary based on the current Zernike tab contents ------#
-        zernike = {"zindex": [], "z": []}
-        for key, item in values.items():
-            row, col = re.findall("[0-9]+", key.partition("_")[-1])
-            if col == "0":
-                # Column 'Zindex'
-                zernike["zindex"].append(item)
-            elif col == "1":
-                # Column 'Z'
-                zernike["z"].append(item)
-        zernike["zindex"] = ",".join(zernike["zindex"])
-        zernike["z"] = ",".join(zernike["z"])
+        # Read only the 'Zindex' and 'Z' columns, row by row: the cell keys are known
+        rows = range(1, self.max_rows + 1)
+        zernike = {
+            "zindex": ",".join([values[f"z_({row},0)"] for row in rows]),
+            "z": ",".join([values[f"z_({row},1)"] for row in rows]),
+        }
         zernike["ordering"] = self.ordering
 
         return zernike
@@ -0,0 +1,94 @@
+import copy
+import os
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from paos.core.parseConfig import parse_config
+from paos.core.run import run
+from paos.core.run import run_wfe
+from paos.log import disableLogging
+
+disableLogging()
+
+this_directory = Path(__file__).parent
+
+conf_file = os.path.join(this_directory.parent, "lens data", "periscope.ini")
+
+
+class RunTest(unittest.TestCase):
+    # relative tolerance of the single precision outputs, with respect to the double precision ones
+    RTOL_FP32 = 1.0e-5
+
+    # a small grid keeps the test fast
+    grid_size = 128
+
+    pup_diameter, parameters, wavelengths, fields, opt_chains = parse_config(conf_file)
+    wavelength = 1.0e-6 * wavelengths[0]
+    field = fields[0]
+    opt_chain = opt_chains[0]
+    surface = next(key for key, item in opt_chain.items() if item["type"] == "Zernike")
+
+    def pop(self, opt_chain, dtype=np.complex128):
+        return run(
+            self.pup_diameter,
+            self.wavelength,
+            self.grid_size,
+            self.parameters["zoom"],
+            self.field,
+            opt_chain,
+            dtype,
+        )
+
+    def check_output(self, output1, output2, rtol):
+        self.assertEqual(output1.keys(), output2.keys())
+        for key in output1.keys():
+            for item in ("amplitude", "wz", "dx", "dy"):
+                with self.subTest(surface=key, item=item):
+                    data1 = output1[key][item]
+                    data2 = output2[key][item]
+                    scale = np.max(np.abs(data2), initial=0.0)
+                    np.testing.assert_allclose(
+                        data1, data2, rtol=rtol, atol=rtol * scale
+                    )
+
+    def test_run_wfe(self):
+        rng = np.random.default_rng(0)
+        Z = 1.0e-7 * rng.standard_normal(len(self.opt_chain[self.surface]["Z"]))
+
+        items = dict(self.opt_chain)
+        Z_input = self.opt_chain[self.surface]["Z"].copy()
+
+        output = run_wfe(
+            self.pup_diameter,
+            self.wavelength,
+            self.grid_size,
+            self.parameters["zoom"],
+            self.field,
+            self.opt_chain,
+            self.surface,
+            Z,
+        )
+
+        opt_chain = copy.deepcopy(self.opt_chain)
+        opt_chain[self.surface]["Z"] = Z
+        self.check_output(output, self.pop(opt_chain), rtol=0.0)
+
+        # the input optical chain is not modified
+        self.assertEqual(items.keys(), self.opt_chain.keys())
+        for key, item in items.items():
+            self.assertIs(self.opt_chain[key], item)
+        np.testing.assert_array_equal(self.opt_chain[self.surface]["Z"], Z_input)
+
+    def test_single_precision(self):
+        output64 = self.pop(self.opt_chain)
+        output32 = self.pop(self.opt_chain, dtype=np.complex64)
+
+        for key in output32.keys():
+            self.assertEqual(output32[key]["wfo"].dtype, np.complex64)
+        self.check_output(output32, output64, rtol=self.RTOL_FP32)
+
+
+if __name__ == "__main__":
+    unittest.main()
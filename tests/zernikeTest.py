@@ -0,0 +1,147 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from paos.classes import wfo as wfo_module
+from paos.classes.wfo import polar_grid
+from paos.classes.wfo import WFO
+from paos.classes.wfo import zernike_polynomials
+from paos.classes.zernike import Zernike
+from paos.log import disableLogging
+
+disableLogging()
+
+
+class ZernikeTest(unittest.TestCase):
+    orderings = ("ansi", "standard", "noll", "fringe")
+
+    # wavefront set up
+    beam_diameter = 1.0
+    wl = 1.0e-6
+    grid_size = 128
+    zoom = 4
+    N = 21
+
+    # first 15 (m, n) pairs of each ordering
+    j2mn_reference = {
+        "ansi": (
+            [0, -1, 1, -2, 0, 2, -3, -1, 1, 3, -4, -2, 0, 2, 4],
+            [0, 1, 1, 2, 2, 2, 3, 3, 3, 3, 4, 4, 4, 4, 4],
+        ),
+        "standard": (
+            [0, 1, -1, 2, 0, -2, 3, 1, -1, -3, 4, 2, 0, -2, -4],
+            [0, 1, 1, 2, 2, 2, 3, 3, 3, 3, 4, 4, 4, 4, 4],
+        ),
+        "noll": (
+            [0, 1, -1, 0, -2, 2, -1, 1, -3, 3, 0, 2, -2, 4, -4],
+            [0, 1, 1, 2, 2, 2, 3, 3, 3, 3, 4, 4, 4, 4, 4],
+        ),
+        "fringe": (
+            [0, 1, -1, 0, 2, -2, 1, -1, 0, 3, -3, 2, -2, 1, -1],
+            [0, 1, 1, 2, 2, 2, 3, 3, 4, 3, 3, 4, 4, 5, 5],
+        ),
+    }
+
+    # index of the first polynomial (piston) returned by Zernike.mn2j
+    mn2j_start = {"ansi": 0, "standard": 0, "noll": 1, "fringe": 1}
+
+    def test_j2mn(self):
+        for ordering, (m_ref, n_ref) in self.j2mn_reference.items():
+            for N in range(1, len(m_ref) + 1):
+                with self.subTest(ordering=ordering, N=N):
+                    m, n = Zernike.j2mn(N, ordering)
+                    np.testing.assert_array_equal(m, m_ref[:N])
+                    np.testing.assert_array_equal(n, n_ref[:N])
+
+    def test_j2mn_mn2j(self):
+        for ordering in self.orderings:
+            for N in range(1, 65):
+                with self.subTest(ordering=ordering, N=N):
+                    m, n = Zernike.j2mn(N, ordering)
+                    start = self.mn2j_start[ordering]
+                    np.testing.assert_array_equal(
+                        Zernike.mn2j(m, n, ordering), np.arange(start, start + N)
+                    )
+
+    def full_sum(self, wfo, Z, ordering, normalize, radius):
+        rho, phi = polar_grid(wfo.wfo.shape, wfo.dx, wfo.dy, radius)
+        zernike = Zernike(len(Z), rho, phi, ordering=ordering, normalize=normalize)
+        return np.sum(np.asarray(Z)[:, None, None] * zernike().data, axis=0)
+
+    def test_zernikes_zero_coefficients(self):
+        rng = np.random.default_rng(0)
+        Z_full = 1.0e-8 * rng.standard_normal(self.N)
+
+        Z_trailing = Z_full.copy()
+        Z_trailing[10:] = 0.0
+        Z_interior = Z_full.copy()
+        Z_interior[[0, 3, 4, 11]] = 0.0
+        Z_sparse = np.zeros(self.N)
+        Z_sparse[7] = Z_full[7]
+
+        for ordering in self.orderings:
+            for normalize in (True, False):
+                for Z in (Z_full, Z_trailing, Z_interior, Z_sparse):
+                    with self.subTest(ordering=ordering, normalize=normalize, Z=Z):
+                        wfo = WFO(
+                            self.beam_diameter,
+                            self.wl,
+                            self.grid_size,
+                            self.zoom,
+                        )
+                        radius = wfo.wz
+                        wfe = wfo.zernikes(
+                            np.arange(self.N), Z, ordering, normalize, radius
+                        )
+
+                        wfe_ref = self.full_sum(wfo, Z, ordering, normalize, radius)
+                        mask = wfe.mask
+                        np.testing.assert_allclose(
+                            wfe.data[~mask],
+                            wfe_ref[~mask],
+                            rtol=1.0e-12,
+                            atol=1.0e-12 * np.max(np.abs(Z)),
+                        )
+                        np.testing.assert_allclose(
+                            wfo.wfo,
+                            np.where(
+                                mask,
+                                0.0,
+                                np.exp(2.0j * np.pi * wfe_ref / self.wl),
+                            ),
+                            rtol=1.0e-12,
+                            atol=1.0e-12,
+                        )
+
+    def test_zernike_cache(self):
+        shape = (64, 64)
+        nbytes = 2 * 64 * 64 * 8  # two polynomials per entry
+
+        with mock.patch.object(wfo_module, "ZERNIKE_CACHE_MAXBYTES", 3 * nbytes):
+            for radius in (0.01, 0.02, 0.03, 0.04):
+                zer = zernike_polynomials(
+                    (2, 5), shape, 1.0e-3, 1.0e-3, radius, 0.0, "x", "ansi", True
+                )
+                # only the active polynomials are returned, and kept
+                self.assertEqual(zer.shape, (2,) + shape)
+                self.assertIs(
+                    zernike_polynomials(
+                        (2, 5), shape, 1.0e-3, 1.0e-3, radius, 0.0, "x", "ansi", True
+                    ),
+                    zer,
+                )
+
+            cached = list(wfo_module._zernike_cache.values())
+            self.assertEqual(len(cached), 3)
+            self.assertEqual(
+                wfo_module._zernike_cache_nbytes, sum(item.nbytes for item in cached)
+            )
+
+            rho, phi = polar_grid(shape, 1.0e-3, 1.0e-3, 0.04)
+            zernike = Zernike(6, rho, phi, ordering="ansi", normalize=True)
+            np.testing.assert_array_equal(zer, zernike().data[[2, 5]])
+
+
+if __name__ == "__main__":
+    unittest.main()